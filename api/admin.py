@@ -1,12 +1,26 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session
+from flask import Blueprint, Response, render_template, request, jsonify, redirect, url_for, session
+import os
+import json
+import hashlib
 import logging
 import time
-from models import User, Admin, db
+import datetime
+from models import User, Admin, db, ROLE_SUPER_ADMIN
+from sqlalchemy import func, text, select, desc, update, bindparam
 from sqlalchemy.exc import SQLAlchemyError
+from celery.result import AsyncResult
 from auth_middleware import super_admin_required
+from api.tasks import celery_app, train_synomind_task, test_genai_task, request_training_control
+from api.cache import cached
+from api.system_metrics import get_system_stats
 
 logger = logging.getLogger(__name__)
 
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # Admin routes
@@ -19,39 +33,57 @@ def admin_index():
         return redirect('/login/')
     return render_template('admin/new_dashboard.html')
 
+# Bare COUNT(*) statements: Query.count() wraps the query in a subquery, which keeps
+# Postgres from answering with an index-only scan (the role filter uses ix_users_role)
+_SQL_COUNT_USERS = text("SELECT COUNT(*) FROM users")
+_SQL_COUNT_USERS_BY_ROLE = text(
+    "SELECT COUNT(*) FROM users WHERE role IN :roles"
+).bindparams(bindparam('roles', expanding=True))
+
+@cached(ttl=60, key='admin:users:counts')
+def _compute_user_counts():
+    """Collect user counts; only plain numbers go through the JSON cache"""
+    total_users = db.session.execute(_SQL_COUNT_USERS).scalar()
+    # Count admin users in one query without loading the rows
+    admin_count = 0
+    try:
+        admin_count = db.session.execute(
+            _SQL_COUNT_USERS_BY_ROLE, {'roles': ['admin', 'super_admin']}
+        ).scalar()
+    except Exception:
+        pass
+    
+    return {
+        'total': total_users,
+        'admins': admin_count,
+        'regular': total_users - admin_count
+    }
+
+def _compute_user_stats():
+    """User counts plus the most recent signups"""
+    # The 10 newest rows come straight off ix_users_created_at and keep their datetimes,
+    # so they are queried per request rather than cached as JSON strings
+    recent_users = db.session.query(
+        User.id, User.uid, User.email, User.role, User.created_at, User.last_login
+    ).order_by(User.created_at.desc()).limit(10).all()
+    
+    # Convert rows to dictionaries for template rendering
+    recent_users_data = [{
+        'id': user.id,
+        'uid': user.uid,
+        'email': user.email or 'No email',
+        'role': user.role,
+        'created_at': user.created_at,
+        'last_login': user.last_login
+    } for user in recent_users]
+    
+    return {**_compute_user_counts(), 'recent': recent_users_data}
+
 @admin_bp.route('/users')
 def admin_users():
     """User management page with real user data"""
-    from models import User, db
     try:
-        # Get actual user count and recent users
-        total_users = User.query.count()
-        recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
-        # Get admin users using proper SQL syntax
-        admin_users = []
-        try:
-            admin_users = User.query.filter(User.role == 'admin').all() + User.query.filter(User.role == 'super_admin').all()
-        except Exception:
-            pass
-        
-        # Convert User objects to dictionaries for template rendering
-        recent_users_data = []
-        for user in recent_users:
-            recent_users_data.append({
-                'id': user.id,
-                'uid': user.uid,
-                'email': user.email or 'No email',
-                'role': user.role,
-                'created_at': user.created_at,
-                'last_login': user.last_login
-            })
-        
-        user_stats = {
-            'total': total_users,
-            'admins': len(admin_users),
-            'regular': total_users - len(admin_users),
-            'recent': recent_users_data
-        }
+        user_stats = _compute_user_stats()
         
         return render_template('admin/user_management.html', 
                              page_title="User Management", 
@@ -63,46 +95,75 @@ def admin_users():
                              page_title="User Management", 
                              page_description="Error loading user data")
 
+# Tables holding each module's records
+_MODULE_TABLES = {
+    'wellness': 'mood_logs',
+    'environment': 'water_readings',
+    'kitchen': 'fridge_items',
+    'marketplace': 'marketplace_items',
+    'wardrobe': 'clothing_items'
+}
+# Re-probed on the same TTL as the stats they feed, so tables created after boot show up
+KNOWN_TABLES_TTL = 60
+_existing_tables = {'tables': None, 'checked_at': 0.0}
+
+# Constant SQL, parsed into TextClause objects once at import time
+_SQL_PUBLIC_TABLES = text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'")
+
+_SQL_USER_TOTAL_AND_ROLES = text("""
+    WITH roles AS (
+        SELECT role, COUNT(*) AS count
+        FROM users
+        GROUP BY role
+    )
+    SELECT (SELECT COUNT(*) FROM users),
+           (SELECT json_agg(roles) FROM roles)
+""")
+
+_SQL_SUPPORT_COUNTS = text("SELECT (SELECT COUNT(*) FROM users), (SELECT COUNT(*) FROM synomind_prompts)")
+_SQL_SUPPORT_COUNTS_NO_PROMPTS = text("SELECT (SELECT COUNT(*) FROM users), 0")
+
+def _known_tables():
+    """Names of the tables in the public schema, re-probed every KNOWN_TABLES_TTL seconds"""
+    now = time.monotonic()
+    if _existing_tables['tables'] is None or now - _existing_tables['checked_at'] >= KNOWN_TABLES_TTL:
+        _existing_tables['tables'] = frozenset(row[0] for row in db.session.execute(_SQL_PUBLIC_TABLES))
+        _existing_tables['checked_at'] = now
+    return _existing_tables['tables']
+
+_module_count_sql = {'tables': None, 'statement': None}
+
+def _module_count_statement():
+    """UNION ALL count over the existing module tables, recompiled only when that set changes"""
+    known = _known_tables()
+    if _module_count_sql['tables'] != known:
+        selects = [f"SELECT '{module}', COUNT(*) FROM {table}"
+                   for module, table in _MODULE_TABLES.items() if table in known]
+        _module_count_sql['statement'] = text(" UNION ALL ".join(selects)) if selects else None
+        _module_count_sql['tables'] = known
+    return _module_count_sql['statement']
+
+@cached(ttl=60, key='admin:modules:stats')
+def _compute_module_stats():
+    """Collect per-module row counts"""
+    # Get module usage statistics
+    module_stats = {}
+    
+    # Count the modules whose tables exist in one round-trip
+    statement = _module_count_statement()
+    counts = dict(db.session.execute(statement).fetchall()) if statement is not None else {}
+    
+    for module in _MODULE_TABLES:
+        count = counts.get(module, 0)
+        module_stats[module] = {'count': count, 'status': 'active' if count > 0 else 'inactive'}
+    return module_stats
+
 # Define routes for all Admin pages
 @admin_bp.route('/modules')
 def admin_modules():
     """Module control page with real module data"""
-    from models import db
-    from sqlalchemy import text
     try:
-        # Get module usage statistics
-        module_stats = {}
-        
-        # Check each module's data availability
-        try:
-            wellness_count = db.session.execute(text("SELECT COUNT(*) FROM mood_logs")).scalar()
-            module_stats['wellness'] = {'count': wellness_count, 'status': 'active' if wellness_count > 0 else 'inactive'}
-        except:
-            module_stats['wellness'] = {'count': 0, 'status': 'inactive'}
-            
-        try:
-            env_count = db.session.execute(text("SELECT COUNT(*) FROM water_readings")).scalar()
-            module_stats['environment'] = {'count': env_count, 'status': 'active' if env_count > 0 else 'inactive'}
-        except:
-            module_stats['environment'] = {'count': 0, 'status': 'inactive'}
-            
-        try:
-            kitchen_count = db.session.execute(text("SELECT COUNT(*) FROM fridge_items")).scalar()
-            module_stats['kitchen'] = {'count': kitchen_count, 'status': 'active' if kitchen_count > 0 else 'inactive'}
-        except:
-            module_stats['kitchen'] = {'count': 0, 'status': 'inactive'}
-            
-        try:
-            marketplace_count = db.session.execute(text("SELECT COUNT(*) FROM marketplace_items")).scalar()
-            module_stats['marketplace'] = {'count': marketplace_count, 'status': 'active' if marketplace_count > 0 else 'inactive'}
-        except:
-            module_stats['marketplace'] = {'count': 0, 'status': 'inactive'}
-            
-        try:
-            wardrobe_count = db.session.execute(text("SELECT COUNT(*) FROM clothing_items")).scalar()
-            module_stats['wardrobe'] = {'count': wardrobe_count, 'status': 'active' if wardrobe_count > 0 else 'inactive'}
-        except:
-            module_stats['wardrobe'] = {'count': 0, 'status': 'inactive'}
+        module_stats = _compute_module_stats()
         
         return render_template('admin/module_control.html', 
                              page_title="Module Control", 
@@ -154,13 +215,10 @@ def save_training_config():
 
 @admin_bp.route('/synomind-training/start-training', methods=['POST'])
 def start_synomind_training():
-    """Start SynoMind AI training with voice and language support using real Gemini API"""
+    """Queue SynoMind AI training with voice and language support using real Gemini API"""
     try:
         training_data = request.get_json()
         
-        # Start real Google AI training
-        import requests
-        
         google_ai_config = {
             'model': 'gemini-1.5-pro',
             'languages': ['en', 'hi', 'te'],
@@ -169,40 +227,28 @@ def start_synomind_training():
             'include_multi_lang': training_data.get('includeMultiLang', False)
         }
         
-        # Call real Google AI training service
-        response = requests.post(
-            'http://localhost:5000/api/google-ai-training/start-training',
-            json=google_ai_config,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('success'):
-                # Store training session locally
-                session['current_training'] = {
-                    'id': result['session_id'],
-                    'status': 'running',
-                    'model': result['model'],
-                    'languages': result['languages'],
-                    'progress': 0,
-                    'start_time': time.time(),
-                    'using_real_ai': True
-                }
-                
-                logger.info(f"Real Gemini AI training started: {result['session_id']}")
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Real Gemini AI training started successfully',
-                    'session_id': result['session_id'],
-                    'model': result['model'],
-                    'languages': result['languages']
-                })
-            else:
-                raise Exception(result.get('error', 'Unknown error'))
-        else:
-            raise Exception(f"Training service error: {response.status_code}")
+        # Hand the training run to a Celery worker so this request returns immediately
+        task = train_synomind_task.delay(google_ai_config)
+        
+        # Store training session locally
+        session['current_training'] = {
+            'id': task.id,
+            'status': 'queued',
+            'model': google_ai_config['model'],
+            'languages': google_ai_config['languages'],
+            'start_time': time.time(),
+            'using_real_ai': True
+        }
+        
+        logger.info(f"Real Gemini AI training queued: {task.id}")
+        
+        return jsonify({
+            'success': True,
+            'message': 'Real Gemini AI training queued successfully',
+            'task_id': task.id,
+            'model': google_ai_config['model'],
+            'languages': google_ai_config['languages']
+        }), 202
     
     except Exception as e:
         logger.error(f"Error starting real AI training: {e}")
@@ -211,32 +257,51 @@ def start_synomind_training():
             'message': f'Error starting training: {str(e)}'
         }), 500
 
+def _training_progress(task_id):
+    """Describe a training task's progress from its Celery result"""
+    result = AsyncResult(task_id, app=celery_app)
+    
+    if result.state == 'FAILURE':
+        return {
+            'progress': 0,
+            'status': 'failed',
+            'task_id': task_id,
+            'message': str(result.info)
+        }
+    
+    info = result.info if isinstance(result.info, dict) else {}
+    if result.successful():
+        status = info.get('status', 'completed')
+    elif result.state == 'REVOKED':
+        status = 'stopped'
+    else:
+        status = 'running' if result.state == 'PROGRESS' else 'queued'
+    
+    return {
+        'progress': info.get('progress', 0),
+        'status': status,
+        'task_id': task_id,
+        'session_id': info.get('session_id')
+    }
+
+def _current_training_task_id():
+    training_session = session.get('current_training')
+    return request.args.get('task_id') or (training_session or {}).get('id')
+
 @admin_bp.route('/synomind-training/progress')
 def get_training_progress():
     """Get current training progress"""
     try:
-        training_session = session.get('current_training')
+        task_id = _current_training_task_id()
         
-        if not training_session:
+        if not task_id:
             return jsonify({
                 'progress': 0,
                 'status': 'not_started',
                 'message': 'No active training session'
             })
         
-        # Simulate progress based on elapsed time
-        elapsed_time = time.time() - training_session['start_time']
-        simulated_progress = min(int((elapsed_time / 300) * 100), 100)  # 5 minutes = 100%
-        
-        training_session['progress'] = simulated_progress
-        session['current_training'] = training_session
-        
-        return jsonify({
-            'progress': simulated_progress,
-            'status': 'running' if simulated_progress < 100 else 'completed',
-            'session_id': training_session['id'],
-            'estimated_remaining': max(0, 300 - elapsed_time) if simulated_progress < 100 else 0
-        })
+        return jsonify(_training_progress(task_id))
     
     except Exception as e:
         logger.error(f"Error getting training progress: {e}")
@@ -246,32 +311,79 @@ def get_training_progress():
             'message': 'Error fetching progress'
         }), 500
 
+# Bound each SSE connection so it can't pin a worker forever; EventSource reconnects on close.
+# Celery reports PENDING ('queued') for unknown or expired task ids too, so give up on those sooner
+PROGRESS_STREAM_MAX_SECONDS = 300
+PROGRESS_STREAM_MAX_QUEUED_POLLS = 60
+
+@admin_bp.route('/synomind-training/progress-stream')
+def stream_training_progress():
+    """Push training progress as Server-Sent Events until the task finishes"""
+    task_id = _current_training_task_id()
+    
+    def generate():
+        if not task_id:
+            yield f"data: {json.dumps({'progress': 0, 'status': 'not_started'})}\n\n"
+            return
+        
+        last = None
+        queued_polls = 0
+        deadline = time.monotonic() + PROGRESS_STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                progress = _training_progress(task_id)
+            except Exception as e:
+                logger.error(f"Error streaming training progress: {e}")
+                yield f"data: {json.dumps({'progress': 0, 'status': 'error'})}\n\n"
+                return
+            
+            # Only push changes; a comment line keeps idle connections alive
+            if progress != last:
+                yield f"data: {json.dumps(progress)}\n\n"
+                last = progress
+            else:
+                yield ": keep-alive\n\n"
+            
+            if progress['status'] not in ('queued', 'running'):
+                return
+            queued_polls = queued_polls + 1 if progress['status'] == 'queued' else 0
+            if queued_polls >= PROGRESS_STREAM_MAX_QUEUED_POLLS:
+                return
+            time.sleep(1)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+# Model catalogue is static, so its ETag is computed once
+_AVAILABLE_MODELS = {
+    'google_ai': {
+        'gemini-1.5-pro': {'status': 'available', 'description': 'Most capable model'},
+        'gemini-1.5-flash': {'status': 'available', 'description': 'Fast and efficient'},
+        'gemini-1.0-pro': {'status': 'available', 'description': 'Stable version'}
+    },
+    'local_models': {
+        'llama-3.1-8b': {'status': 'loaded', 'size': '4.7GB'},
+        'mistral-7b': {'status': 'downloading', 'progress': 67},
+        'codellama-13b': {'status': 'available', 'size': '8.2GB'}
+    },
+    'pretrained_models': {
+        'gpt-4-turbo': {'status': 'connected', 'provider': 'OpenAI'},
+        'claude-3-sonnet': {'status': 'available', 'provider': 'Anthropic'},
+        'palm-2': {'status': 'api_required', 'provider': 'Google'}
+    }
+}
+_AVAILABLE_MODELS_ETAG = hashlib.md5(json.dumps(_AVAILABLE_MODELS, sort_keys=True).encode()).hexdigest()
+
 @admin_bp.route('/synomind-training/models')
 def get_available_models():
     """Get list of available AI models for training"""
     try:
-        models = {
-            'google_ai': {
-                'gemini-1.5-pro': {'status': 'available', 'description': 'Most capable model'},
-                'gemini-1.5-flash': {'status': 'available', 'description': 'Fast and efficient'},
-                'gemini-1.0-pro': {'status': 'available', 'description': 'Stable version'}
-            },
-            'local_models': {
-                'llama-3.1-8b': {'status': 'loaded', 'size': '4.7GB'},
-                'mistral-7b': {'status': 'downloading', 'progress': 67},
-                'codellama-13b': {'status': 'available', 'size': '8.2GB'}
-            },
-            'pretrained_models': {
-                'gpt-4-turbo': {'status': 'connected', 'provider': 'OpenAI'},
-                'claude-3-sonnet': {'status': 'available', 'provider': 'Anthropic'},
-                'palm-2': {'status': 'api_required', 'provider': 'Google'}
-            }
-        }
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'models': models
+            'models': _AVAILABLE_MODELS
         })
+        response.set_etag(_AVAILABLE_MODELS_ETAG)
+        response.headers['Cache-Control'] = 'public, max-age=300, stale-while-revalidate=60'
+        return response.make_conditional(request)
     
     except Exception as e:
         logger.error(f"Error getting models: {e}")
@@ -292,18 +404,20 @@ def stop_synomind_training():
                 'message': 'No active training session to stop'
             }), 400
         
-        # Stop the training session
-        training_session['status'] = 'stopped'
+        # Drop the task if still queued, and tell a running one to stop after its current batch
+        celery_app.control.revoke(training_session['id'])
+        request_training_control(training_session['id'], 'stopped')
+        training_session['status'] = 'stopping'
         training_session['end_time'] = time.time()
         session['current_training'] = training_session
         
-        logger.info(f"Training session {training_session['id']} stopped")
+        logger.info(f"Training session {training_session['id']} stop requested")
         
         return jsonify({
             'success': True,
-            'message': 'Training stopped successfully',
+            'message': 'Training stop requested',
             'session_id': training_session['id']
-        })
+        }), 202
     
     except Exception as e:
         logger.error(f"Error stopping training: {e}")
@@ -324,18 +438,19 @@ def pause_synomind_training():
                 'message': 'No active training session to pause'
             }), 400
         
-        # Pause the training session
-        training_session['status'] = 'paused'
+        # Tell the worker to pause after its current batch
+        request_training_control(training_session['id'], 'paused')
+        training_session['status'] = 'pausing'
         training_session['pause_time'] = time.time()
         session['current_training'] = training_session
         
-        logger.info(f"Training session {training_session['id']} paused")
+        logger.info(f"Training session {training_session['id']} pause requested")
         
         return jsonify({
             'success': True,
-            'message': 'Training paused successfully',
+            'message': 'Training pause requested',
             'session_id': training_session['id']
-        })
+        }), 202
     
     except Exception as e:
         logger.error(f"Error pausing training: {e}")
@@ -346,10 +461,13 @@ def pause_synomind_training():
 
 @admin_bp.route('/synomind-training/test-google-ai', methods=['POST'])
 def test_google_ai():
-    """Test Google AI connection with your API key"""
+    """Queue a Google AI connection test with your API key"""
     try:
-        import os
-        import google.generativeai as genai
+        if genai is None:
+            return jsonify({
+                'success': False,
+                'message': 'Google AI library not available'
+            }), 500
         
         # Get your actual Google API key
         google_api_key = os.environ.get('GOOGLE_API_KEY')
@@ -360,36 +478,48 @@ def test_google_ai():
                 'message': 'Google API key not found in environment'
             }), 400
         
-        # Configure and test Google AI
-        genai.configure(api_key=google_api_key)
-        model = genai.GenerativeModel('gemini-1.5-pro-latest')
-        
-        # Test with a simple SynoMind prompt
+        # Test with a simple SynoMind prompt on a Celery worker
         test_prompt = "You are SynoMind, an eco-friendly AI assistant. Please introduce yourself and explain how you help users with sustainable living."
         
-        response = model.generate_content(test_prompt)
-        
-        logger.info("Google AI test successful with real API key")
+        task = test_genai_task.delay(test_prompt)
         
         return jsonify({
             'success': True,
-            'message': 'Google AI connection successful',
-            'test_response': response.text[:200] + "..." if len(response.text) > 200 else response.text,
-            'model': 'gemini-1.5-pro',
+            'message': 'Google AI connection test queued',
+            'task_id': task.id,
             'api_key_status': 'configured'
-        })
+        }), 202
     
-    except ImportError:
+    except Exception as e:
+        logger.error(f"Google AI test failed: {e}")
         return jsonify({
             'success': False,
-            'message': 'Google AI library not available'
+            'message': f'Google AI test failed: {str(e)}'
         }), 500
+
+@admin_bp.route('/synomind-training/task-status/<task_id>')
+def get_task_status(task_id):
+    """Get the state and result of a queued background task"""
+    try:
+        result = AsyncResult(task_id, app=celery_app)
+        
+        response = {
+            'success': True,
+            'task_id': task_id,
+            'state': result.state
+        }
+        if result.successful():
+            response['result'] = result.result
+        elif result.failed():
+            response['error'] = str(result.result)
+        
+        return jsonify(response)
     
     except Exception as e:
-        logger.error(f"Google AI test failed: {e}")
+        logger.error(f"Error getting task status: {e}")
         return jsonify({
             'success': False,
-            'message': f'Google AI test failed: {str(e)}'
+            'message': 'Error fetching task status'
         }), 500
 
 @admin_bp.route('/synomind-training/google-ai-config', methods=['POST'])
@@ -421,32 +551,41 @@ def configure_google_ai():
             'message': 'Error configuring Google AI'
         }), 500
 
+# Voice sample texts in different languages
+_SAMPLE_TEXTS = {
+    'en-male-1': "Hello, I'm SynoMind, your eco-friendly AI assistant. How can I help you today?",
+    'en-female-1': "Welcome to EcoSyno! I'm here to guide you on your sustainable living journey.",
+    'en-neural-1': "Let's explore eco-friendly solutions together. What would you like to learn about?",
+    'hi-male-1': "नमस्ते, मैं SynoMind हूं, आपका पर्यावरण-अनुकूल AI सहायक। आज मैं आपकी कैसे मदद कर सकता हूं?",
+    'hi-female-1': "EcoSyno में आपका स्वागत है! मैं आपकी टिकाऊ जीवनशैली की यात्रा में मार्गदर्शन के लिए यहां हूं।",
+    'hi-neural-1': "आइए एक साथ पर्यावरण-अनुकूल समाधान खोजें। आप क्या सीखना चाहते हैं?",
+    'te-male-1': "నమస్కారం, నేను SynoMind, మీ పర్యావరణ అనుకూల AI సహాయకుడిని. ఈరోజు నేను మీకు ఎలా సహాయం చేయగలను?",
+    'te-female-1': "EcoSyno కి స్వాగతం! మీ స్థిరమైన జీవన యాత్రలో మార్గదర్శనం చేయడానికి నేను ఇక్కడ ఉన్నాను.",
+    'te-neural-1': "మనం కలిసి పర్యావరణ అనుకూల పరిష్కారాలను అన్వేషిద్దాం. మీరు దేని గురించి తెలుసుకోవాలనుకుంటున్నారు?"
+}
+
+def _voice_meta(voice_id, sample_text):
+    """Describe a voice id by language, gender and voice type"""
+    return {
+        'sample_text': sample_text,
+        'language': voice_id.split('-')[0],
+        'gender': 'female' if 'female' in voice_id else 'male',
+        'type': 'neural' if 'neural' in voice_id else 'standard'
+    }
+
+# Metadata for the known voices, derived once at import time
+_VOICE_META = {voice_id: _voice_meta(voice_id, sample_text) for voice_id, sample_text in _SAMPLE_TEXTS.items()}
+
 @admin_bp.route('/synomind-training/voice-sample/<voice_id>')
 def generate_voice_sample(voice_id):
     """Generate voice sample for testing"""
     try:
-        # Voice sample texts in different languages
-        sample_texts = {
-            'en-male-1': "Hello, I'm SynoMind, your eco-friendly AI assistant. How can I help you today?",
-            'en-female-1': "Welcome to EcoSyno! I'm here to guide you on your sustainable living journey.",
-            'en-neural-1': "Let's explore eco-friendly solutions together. What would you like to learn about?",
-            'hi-male-1': "नमस्ते, मैं SynoMind हूं, आपका पर्यावरण-अनुकूल AI सहायक। आज मैं आपकी कैसे मदद कर सकता हूं?",
-            'hi-female-1': "EcoSyno में आपका स्वागत है! मैं आपकी टिकाऊ जीवनशैली की यात्रा में मार्गदर्शन के लिए यहां हूं।",
-            'hi-neural-1': "आइए एक साथ पर्यावरण-अनुकूल समाधान खोजें। आप क्या सीखना चाहते हैं?",
-            'te-male-1': "నమస్కారం, నేను SynoMind, మీ పర్యావరణ అనుకూల AI సహాయకుడిని. ఈరోజు నేను మీకు ఎలా సహాయం చేయగలను?",
-            'te-female-1': "EcoSyno కి స్వాగతం! మీ స్థిరమైన జీవన యాత్రలో మార్గదర్శనం చేయడానికి నేను ఇక్కడ ఉన్నాను.",
-            'te-neural-1': "మనం కలిసి పర్యావరణ అనుకూల పరిష్కారాలను అన్వేషిద్దాం. మీరు దేని గురించి తెలుసుకోవాలనుకుంటున్నారు?"
-        }
-        
-        text = sample_texts.get(voice_id, "Sample voice for SynoMind training")
+        meta = _VOICE_META.get(voice_id) or _voice_meta(voice_id, "Sample voice for SynoMind training")
         
         return jsonify({
             'success': True,
             'voice_id': voice_id,
-            'sample_text': text,
-            'language': voice_id.split('-')[0],
-            'gender': 'female' if 'female' in voice_id else 'male',
-            'type': 'neural' if 'neural' in voice_id else 'standard'
+            **meta
         })
     
     except Exception as e:
@@ -456,45 +595,41 @@ def generate_voice_sample(voice_id):
             'message': 'Error generating voice sample'
         }), 500
 
+@cached(ttl=60, key='admin:analytics:users')
+def _compute_user_analytics():
+    """Collect user totals, 30-day signup trend and role distribution"""
+    # Total and role distribution in one round-trip
+    total_users, role_stats = db.session.execute(_SQL_USER_TOTAL_AND_ROLES).one()
+    
+    # Signup trend streamed in chunks so longer windows don't spike memory
+    cutoff = datetime.date.today() - datetime.timedelta(days=30)
+    signup_date = func.date(User.created_at).label('date')
+    trend_stmt = (
+        select(signup_date, func.count().label('count'))
+        .where(User.created_at >= cutoff)
+        .group_by(signup_date)
+        .order_by(desc(signup_date))
+        .execution_options(yield_per=500)
+    )
+    user_trends = [{'date': str(day), 'count': count} for day, count in db.session.execute(trend_stmt)]
+    
+    return {
+        'total_users': total_users,
+        'user_trends': user_trends,
+        'role_distribution': [{'role': row['role'], 'count': row['count']} for row in role_stats] if role_stats else []
+    }
+
 @admin_bp.route('/analytics')
 def admin_analytics():
     """Analytics dashboard with real data"""
-    from models import User, db
-    from sqlalchemy import func, text
-    import psutil
-    import datetime
-    
     try:
-        # Get user analytics
-        total_users = User.query.count()
-        
-        # Get user registration trends
-        user_trends = db.session.execute(text("""
-            SELECT DATE(created_at) as date, COUNT(*) as new_users
-            FROM users 
-            WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
-            GROUP BY DATE(created_at) 
-            ORDER BY date DESC
-        """)).fetchall()
-        
-        # Get role distribution
-        role_stats = db.session.execute(text("""
-            SELECT role, COUNT(*) as count 
-            FROM users 
-            GROUP BY role
-        """)).fetchall()
-        
-        # System performance metrics
-        system_stats = {
-            'cpu_usage': psutil.cpu_percent(interval=1),
-            'memory_usage': psutil.virtual_memory().percent,
-            'disk_usage': psutil.disk_usage('/').percent
-        }
+        user_analytics = _compute_user_analytics()
+        
+        # System performance metrics from the background sampler
+        system_stats = get_system_stats()
         
         analytics_data = {
-            'total_users': total_users,
-            'user_trends': [{'date': str(row[0]), 'count': row[1]} for row in user_trends] if user_trends else [],
-            'role_distribution': [{'role': row[0], 'count': row[1]} for row in role_stats] if role_stats else [],
+            **user_analytics,
             'system_performance': system_stats,
             'module_usage': {
                 'mood_logs': 0,
@@ -520,24 +655,32 @@ def admin_reports():
     """Reports panel page"""
     return render_template('admin/new_dashboard.html', page_title="Reports Panel", page_description="View and generate detailed system reports")
 
+@cached(ttl=60, key='admin:support:stats')
+def _compute_support_stats():
+    """Collect user and AI interaction counts for the support panel"""
+    try:
+        # Skip the prompts count when that table hasn't been created yet
+        if 'synomind_prompts' in _known_tables():
+            row = db.session.execute(_SQL_SUPPORT_COUNTS).first()
+        else:
+            row = db.session.execute(_SQL_SUPPORT_COUNTS_NO_PROMPTS).first()
+    except SQLAlchemyError as e:
+        # Re-raise rather than return zeros, which @cached would then serve for the whole TTL
+        logger.error(f"Error counting support stats: {e}")
+        raise
+    
+    # Get support statistics from actual database
+    return {
+        'total_users': row[0] or 0,
+        'ai_interactions': row[1] or 0,
+        'recent_activity': []
+    }
+
 @admin_bp.route('/support')
 def admin_support():
     """Support panel with real feedback data"""
-    from models import db
-    from sqlalchemy import text
     try:
-        # Get support statistics from actual database
-        support_stats = {
-            'total_users': 0,
-            'ai_interactions': 0,
-            'recent_activity': []
-        }
-        
-        try:
-            support_stats['total_users'] = db.session.execute(text("SELECT COUNT(*) FROM users")).scalar() or 0
-            support_stats['ai_interactions'] = db.session.execute(text("SELECT COUNT(*) FROM synomind_prompts")).scalar() or 0
-        except:
-            pass
+        support_stats = _compute_support_stats()
             
         return render_template('admin/support.html', 
                              page_title="Support & Feedback", 
@@ -554,32 +697,54 @@ def admin_feedback_classifier():
     """Feedback classifier page"""
     return render_template('admin/new_dashboard.html', page_title="Feedback Classifier", page_description="AI-powered feedback categorization and analysis")
 
+# Content stats are recomputed only when a content root's mtime changes
+_CONTENT_ROOTS = ('templates', 'static', 'templates/modules')
+_content_cache = {'mtime': None, 'stats': None}
+
+def _iter_files(root):
+    """Yield file names under root using scandir's cached entry types"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            else:
+                yield entry.name
+
+def _content_stats():
+    """Count templates, static files and module templates on disk"""
+    mtime = tuple(os.stat(root).st_mtime if os.path.exists(root) else 0 for root in _CONTENT_ROOTS)
+    if mtime == _content_cache['mtime']:
+        return _content_cache['stats']
+    
+    # Get content statistics from filesystem
+    content_stats = {
+        'templates': 0,
+        'static_files': 0,
+        'modules': 0,
+        'total_size': 0
+    }
+    
+    # Count templates
+    if os.path.exists('templates'):
+        content_stats['templates'] = sum(1 for name in _iter_files('templates') if name.endswith('.html'))
+    
+    # Count static files
+    if os.path.exists('static'):
+        content_stats['static_files'] = sum(1 for _ in _iter_files('static'))
+            
+    # Count module templates
+    if os.path.exists('templates/modules'):
+        with os.scandir('templates/modules') as entries:
+            content_stats['modules'] = sum(1 for entry in entries if entry.name.endswith('.html'))
+    
+    _content_cache.update(mtime=mtime, stats=content_stats)
+    return content_stats
+
 @admin_bp.route('/content')
 def admin_content():
     """Content management with real data"""
-    import os
     try:
-        # Get content statistics from filesystem
-        content_stats = {
-            'templates': 0,
-            'static_files': 0,
-            'modules': 0,
-            'total_size': 0
-        }
-        
-        # Count templates
-        if os.path.exists('templates'):
-            for root, dirs, files in os.walk('templates'):
-                content_stats['templates'] += len([f for f in files if f.endswith('.html')])
-        
-        # Count static files
-        if os.path.exists('static'):
-            for root, dirs, files in os.walk('static'):
-                content_stats['static_files'] += len(files)
-                
-        # Count module templates
-        if os.path.exists('templates/modules'):
-            content_stats['modules'] = len([f for f in os.listdir('templates/modules') if f.endswith('.html')])
+        content_stats = _content_stats()
             
         return render_template('admin/content.html', 
                              page_title="Content Management", 
@@ -674,17 +839,19 @@ def upgrade_admin_page():
 @admin_bp.route('/make-super-admin')
 def make_super_admin():
     """Upgrade the current admin to a Super Admin"""
-    from models import User, ROLE_SUPER_ADMIN
-    
     try:
         # For simplicity, use admin@ecosyno.app which we know exists
         admin_email = "admin@ecosyno.app"
-        admin = User.query.filter_by(email=admin_email).first()
+        # Upgrade the admin to Super Admin role in a single UPDATE
+        admin = db.session.execute(
+            update(User)
+            .where(User.email == admin_email)
+            .values(role=ROLE_SUPER_ADMIN)
+            .returning(User.email)
+        ).first()
+        db.session.commit()
             
         if admin:
-            # Upgrade the admin to Super Admin role
-            admin.role = ROLE_SUPER_ADMIN
-            db.session.commit()
             
             return render_template('admin_upgrade.html', 
                                   email=admin_email, 
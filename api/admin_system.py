@@ -3,54 +3,286 @@ EcoSyno Admin System Management
 Comprehensive admin functionality for real-world application
 """
 
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask import Blueprint, current_app, render_template, request, jsonify, redirect, url_for, flash
 from flask_login import login_required, current_user
 from auth_middleware import admin_required, super_admin_required
-from models import User, db
-from sqlalchemy import func, text, desc
+from flask_jwt_extended import decode_token, get_unverified_jwt_headers
+from flask_jwt_extended.internal_utils import verify_token_type, verify_token_not_blocklisted
+from models import User, db, ROLE_ADMIN, ROLE_SUPER_ADMIN
+from sqlalchemy import func, text, desc, tuple_, bindparam, and_, or_
+from sqlalchemy.orm import load_only
 import logging
 import sys
-import psutil
+import time
+import hashlib
 import datetime
+from functools import wraps
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from api.system_metrics import BOOT_TIME, get_system_stats, get_active_connections
+from api.cache import cached, redis_client
 
 logger = logging.getLogger(__name__)
 
 admin_system_bp = Blueprint('admin_system', __name__, url_prefix='/admin')
 
+# Per-module activity log tables
+ACTIVITY_TABLES = ('mood_logs', 'water_readings', 'plant_logs', 'budget_logs')
+
+# Source tables of the module_activity_daily view and their dashboard labels
+MODULE_ACTIVITY_SOURCES = {
+    'mood_logs': 'Mood Tracking',
+    'water_readings': 'Water Monitoring',
+    'plant_logs': 'Plant Care',
+    'budget_logs': 'Budget Management',
+    'synomind_prompts': 'AI Interactions'
+}
+
+ModuleUsage = namedtuple('ModuleUsage', ['module', 'usage_count'])
+
+_SQL_ACTIVITY_RELATIONS = text("""
+    SELECT relname FROM pg_class
+    WHERE relnamespace = 'public'::regnamespace AND relkind IN ('r', 'p', 'm') AND relname IN :names
+""").bindparams(bindparam('names', expanding=True))
+
+def _activity_relations(conn):
+    """Which of module_activity_daily and its source tables exist in the public schema"""
+    names = ['module_activity_daily', *MODULE_ACTIVITY_SOURCES]
+    return {row[0] for row in conn.execute(_SQL_ACTIVITY_RELATIONS, {'names': names})}
+
+def create_module_activity_view(conn):
+    """Create the daily per-module activity view over the source tables that exist, plus the unique index CONCURRENTLY refresh needs"""
+    existing = _activity_relations(conn)
+    sources = [table for table in MODULE_ACTIVITY_SOURCES if table in existing]
+    if not sources:
+        logger.warning("No module activity tables exist yet; module_activity_daily not created")
+        return
+    selects = "\n            UNION ALL\n            ".join(
+        f"SELECT '{table}' AS module, DATE(created_at) AS day, COUNT(*) AS n FROM {table} GROUP BY DATE(created_at)"
+        for table in sources
+    )
+    conn.execute(text(f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS module_activity_daily AS
+            {selects}
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_module_activity_daily ON module_activity_daily (module, day)"
+    ))
+
+# Set once the view is seen; it is never dropped, so the catalog is not probed again
+_module_activity_view_ready = False
+
+def _live_activity_tables():
+    """None once module_activity_daily exists; until then, the source tables to query live"""
+    global _module_activity_view_ready
+    if _module_activity_view_ready:
+        return None
+    existing = _activity_relations(db.session)
+    if 'module_activity_daily' in existing:
+        _module_activity_view_ready = True
+        return None
+    return tuple(table for table in MODULE_ACTIVITY_SOURCES if table in existing)
+
+def _live_module_usage_statement(tables):
+    """Per-table activity totals straight from the source tables, for when the view is missing"""
+    return text(" UNION ALL ".join(f"SELECT '{table}', COUNT(*) FROM {table}" for table in tables))
+
+def _live_daily_activity_statement(tables):
+    """Last 7 days of activity per day straight from the source tables, for when the view is missing"""
+    recent = " UNION ALL ".join(
+        f"SELECT created_at FROM {table} WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'" for table in tables
+    )
+    return text(f"""
+        SELECT DATE(created_at) as date, COUNT(*) as activities
+        FROM ({recent}) AS recent
+        GROUP BY DATE(created_at)
+        ORDER BY date
+    """)
+
+_SQL_REFRESH_MODULE_ACTIVITY = text("REFRESH MATERIALIZED VIEW CONCURRENTLY module_activity_daily")
+
+def refresh_module_activity_view(conn):
+    """Recompute module_activity_daily without blocking readers"""
+    conn.execute(_SQL_REFRESH_MODULE_ACTIVITY)
+
+# Bumped after each committed refresh; the activity API uses it as its ETag
+MODULE_ACTIVITY_VERSION_KEY = 'admin:module_activity:version'
+
+def mark_module_activity_refreshed():
+    """Record that module_activity_daily holds new data (call after the refresh commits)"""
+    redis_client.set(MODULE_ACTIVITY_VERSION_KEY, str(time.time()))
+
+def module_activity_version():
+    """Version stamp of the current module_activity_daily contents, or None if unknown"""
+    try:
+        version = redis_client.get(MODULE_ACTIVITY_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read module activity version: {e}")
+        return None
+    return version.decode() if version else None
+
+def analytics_engine():
+    """Engine for lag-tolerant admin reads: the 'analytics' replica bind if configured, else the primary"""
+    return db.engines.get('analytics', db.engine)
+
+# Independent read-only admin queries run side by side on their own pooled connections
+# Widest fan-out is module_control: one estimate per activity table plus the distinct-users count
+_query_pool = ThreadPoolExecutor(max_workers=len(ACTIVITY_TABLES) + 1, thread_name_prefix='admin-query')
+
+def _parallel_fetch(statements):
+    """Execute independent statements concurrently on the analytics engine and return each one's rows"""
+    engine = analytics_engine()  # resolved here, inside the app context
+    
+    def fetch(statement):
+        with engine.connect() as conn:
+            return conn.execute(statement).fetchall()
+    
+    return list(_query_pool.map(fetch, statements))
+
+# Scalar subquery for the planner's users estimate, falling back to an exact count
+# while reltuples is still -1 (table never analyzed); COALESCE stops at the first non-null
+ESTIMATED_USERS_SQL = """COALESCE(
+                    NULLIF((SELECT reltuples::bigint FROM pg_class WHERE relname = 'users'), -1),
+                    (SELECT COUNT(*) FROM users))"""
+
+# SQL for the admin handlers, parsed into TextClause objects once at import time
+# Approximate row count per activity table from planner statistics, avoiding a full table scan;
+# reltuples is -1 until the table has been analyzed, so fall back to an exact count then
+_SQL_ESTIMATED_ROWS = {table: text(f"""SELECT COALESCE(
+    NULLIF((SELECT reltuples::bigint FROM pg_class WHERE relname = '{table}'), -1),
+    (SELECT COUNT(*) FROM {table}))""") for table in ACTIVITY_TABLES}
+
+# UNION already de-duplicates, so the database returns just the count. This stays one
+# statement: per-table DISTINCTs run concurrently would still need a merge to de-duplicate
+_SQL_DISTINCT_ACTIVE_USERS = text("SELECT COUNT(*) FROM (" + " UNION ".join(
+    f"SELECT user_id FROM {table} WHERE user_id IS NOT NULL" for table in ACTIVITY_TABLES
+) + ") AS active_users")
+
+_SQL_SYSTEM_STATS = text(f"""
+    SELECT 
+        {ESTIMATED_USERS_SQL} as total_users,
+        (SELECT COUNT(*) FROM users WHERE created_at > now() - interval '24 hours') as active_sessions
+""")
+
+# pg_stat_activity syncs with every backend and pg_database_size walks the data directory
+_SQL_SERVER_STATS = text("""
+    SELECT 
+        pg_size_pretty(pg_database_size(current_database())) as db_size,
+        (SELECT count(*) FROM pg_stat_activity WHERE state = 'active') as active_queries
+""")
+
+# Bare COUNT(*) so Postgres can answer from ix_users_last_login_at with an index-only scan
+_SQL_ACTIVE_USERS_LAST_HOUR = text(
+    "SELECT COUNT(*) FROM users WHERE last_login_at > now() - interval '1 hour'"
+)
+
+_SQL_ROLE_DIST = text("""
+    SELECT role, COUNT(*) as count 
+    FROM users 
+    GROUP BY role 
+    ORDER BY count DESC
+""")
+
+_SQL_USER_COUNTS = text(f"""
+    SELECT 
+        {ESTIMATED_USERS_SQL} as total_users,
+        (SELECT COUNT(*) FROM users WHERE last_login_at > now() - interval '1 day') as active_today,
+        (SELECT COUNT(*) FROM users WHERE created_at > now() - interval '7 days') as new_this_week
+""")
+
+_SQL_USER_ANALYTICS = text("""
+    SELECT 
+        (SELECT COUNT(*) FROM users) as total_users,
+        (SELECT COUNT(*) FROM users WHERE created_at > now() - interval '1 day') as new_users_today,
+        (SELECT COUNT(*) FROM users WHERE last_login_at > now() - interval '7 days') as active_users_week
+""")
+
+_SQL_USER_GROWTH = text("""
+    SELECT 
+        DATE(created_at) as date, 
+        COUNT(*) as new_users
+    FROM users 
+    WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
+    GROUP BY DATE(created_at)
+    ORDER BY date
+""")
+
+_SQL_MODULE_USAGE = text("""
+    SELECT module, SUM(n) FROM module_activity_daily GROUP BY module
+""")
+
+_SQL_BUDGET_SUMMARY = text("""
+    SELECT 
+        COALESCE(SUM(amount), 0) as total_budget,
+        COALESCE(AVG(amount), 0) as avg_transaction,
+        COUNT(*) as transaction_count
+    FROM budget_logs
+    WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
+""")
+
+_SQL_BUDGET_MONTHLY = text("""
+    SELECT 
+        DATE_TRUNC('month', created_at) as month,
+        SUM(amount) as total,
+        COUNT(*) as transactions
+    FROM budget_logs
+    WHERE created_at >= CURRENT_DATE - INTERVAL '12 months'
+    GROUP BY DATE_TRUNC('month', created_at)
+    ORDER BY month
+""")
+
+_SQL_DAILY_ACTIVITY = text("""
+    SELECT day as date, SUM(n) as activities
+    FROM module_activity_daily
+    WHERE module IN :modules AND day >= CURRENT_DATE - INTERVAL '7 days'
+    GROUP BY day
+    ORDER BY day
+""").bindparams(bindparam('modules', expanding=True))
+
+# Blueprints are all registered before the first request, so the counts never change
+_BLUEPRINT_ENDPOINT_COUNTS = {}
+
+def blueprint_endpoint_counts(app):
+    """Number of URL rules per blueprint, counted once from the app's URL map"""
+    if not _BLUEPRINT_ENDPOINT_COUNTS:
+        _BLUEPRINT_ENDPOINT_COUNTS.update(Counter(
+            rule.endpoint.rsplit('.', 1)[0] for rule in app.url_map.iter_rules() if '.' in rule.endpoint
+        ))
+    return _BLUEPRINT_ENDPOINT_COUNTS
+
+@cached(ttl=60, key='admin:system:server_stats')
+def _server_stats():
+    """Database size and active query count, refreshed at most once a minute"""
+    row = db.session.execute(_SQL_SERVER_STATS).fetchone()
+    return {'db_size': row.db_size, 'active_queries': row.active_queries}
+
 @admin_system_bp.route('/system-administration')
 @login_required
 @super_admin_required
 def system_administration():
     """Complete system administration dashboard"""
     try:
+        # Get application metrics in one round-trip (recent activity uses created_at as a proxy);
+        # database size and performance come from a once-a-minute cache
+        db_stats = db.session.execute(_SQL_SYSTEM_STATS).fetchone()
+        server_stats = _server_stats()
+        # Plain rows only from here on: hand the connection back before rendering
+        db.session.close()
+        
         # Get system information
         system_info = {
-            'cpu_usage': psutil.cpu_percent(interval=1),
-            'memory_usage': psutil.virtual_memory().percent,
-            'disk_usage': psutil.disk_usage('/').percent,
-            'uptime': datetime.datetime.now() - datetime.datetime.fromtimestamp(psutil.boot_time()),
-            'active_connections': len(psutil.net_connections()),
+            **get_system_stats(),
+            'uptime': datetime.datetime.now() - datetime.datetime.fromtimestamp(BOOT_TIME),
+            'active_connections': get_active_connections(),
             'python_version': sys.version,
             'database_status': 'Connected'
         }
         
-        # Get application metrics
-        total_users = User.query.count()
-        # Count users with recent activity (using created_at as proxy for activity)
-        active_sessions = User.query.filter(User.created_at > datetime.datetime.now() - datetime.timedelta(hours=24)).count()
-        
-        # Get database size and performance
-        db_stats = db.session.execute(text("""
-            SELECT 
-                pg_size_pretty(pg_database_size(current_database())) as db_size,
-                (SELECT count(*) FROM pg_stat_activity WHERE state = 'active') as active_queries
-        """)).fetchone()
-        
         system_metrics = {
-            'total_users': total_users,
-            'active_sessions': active_sessions,
-            'database_size': db_stats[0] if db_stats else 'Unknown',
-            'active_queries': db_stats[1] if db_stats else 0
+            'total_users': db_stats.total_users,
+            'active_sessions': db_stats.active_sessions,
+            'database_size': server_stats['db_size'] or 'Unknown',
+            'active_queries': server_stats['active_queries'] or 0
         }
         
         return render_template('admin/system_administration.html',
@@ -64,6 +296,21 @@ def system_administration():
         flash(f"Error loading system data: {str(e)}", 'error')
         return redirect(url_for('admin.admin_dashboard'))
 
+def _parse_user_cursor(cursor):
+    """(created_at, id) to seek past from a 'created_at|id' cursor; None if absent or malformed.
+    created_at is empty (parsed as None) when the previous page ended on a user without one."""
+    if not cursor:
+        return None
+    try:
+        created_at, user_id = cursor.rsplit('|', 1)
+        return (datetime.datetime.fromisoformat(created_at) if created_at else None), int(user_id)
+    except ValueError:
+        return None
+
+def _user_cursor(user):
+    """'created_at|id' cursor that resumes after this user"""
+    return f"{user.created_at.isoformat() if user.created_at else ''}|{user.id}"
+
 @admin_system_bp.route('/user-management')
 @login_required
 @admin_required
@@ -73,39 +320,65 @@ def user_management():
         page = request.args.get('page', 1, type=int)
         per_page = 20
         
-        # Get paginated users
-        users_query = User.query.order_by(desc(User.created_at))
-        users_pagination = users_query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Get paginated users; the total comes from the estimate below, so skip paginate's COUNT(*)
+        # Load only the columns the user table renders; anything else lazy-loads on access
+        users_query = User.query.options(load_only(
+            User.id, User.username, User.email, User.role,
+            User.created_at, User.last_login_at, User.is_active
+        )).order_by(desc(User.created_at), desc(User.id))
+        seek = _parse_user_cursor(request.args.get('cursor'))
+        if seek:
+            # Keyset pagination: seek past the previous page's last row instead of OFFSET-scanning.
+            # NULL created_at sorts first under DESC, so after a NULL row come the remaining
+            # NULL rows by id and then every dated row; a dated cursor has already passed them all
+            seek_created_at, seek_id = seek
+            if seek_created_at is None:
+                users_query = users_query.filter(or_(
+                    and_(User.created_at.is_(None), User.id < seek_id), User.created_at.isnot(None)
+                ))
+            else:
+                users_query = users_query.filter(tuple_(User.created_at, User.id) < seek)
+            # The table total says nothing about rows past the cursor; one extra row tells if a next page exists
+            users_pagination = users_query.paginate(page=1, per_page=per_page + 1, error_out=False, count=False)
+            has_next = len(users_pagination.items) > per_page
+            users_pagination.items = users_pagination.items[:per_page]
+            users_pagination.per_page = per_page
+            users_pagination.total = len(users_pagination.items) + has_next
+        else:
+            users_pagination = users_query.paginate(
+                page=page, per_page=per_page, error_out=False, count=False
+            )
+            has_next = len(users_pagination.items) == per_page
+        next_cursor = _user_cursor(users_pagination.items[-1]) if has_next and users_pagination.items else None
+        next_page_url = url_for('admin_system.user_management', cursor=next_cursor) if next_cursor else None
+        
+        # Get role distribution; the per-role stats are read from the same rows
+        role_distribution = db.session.execute(_SQL_ROLE_DIST).fetchall()
+        roles = dict(role_distribution)
+        
+        # Get the remaining user statistics in one round-trip
+        counts = db.session.execute(_SQL_USER_COUNTS).fetchone()
+        
+        # Page mode: paginate() skipped its COUNT(*); give it the total so pages/has_next still work
+        if not seek:
+            users_pagination.total = counts.total_users
         
-        # Get user statistics
         user_stats = {
-            'total_users': User.query.count(),
-            'admin_users': User.query.filter(User.role == 'admin').count(),
-            'super_admin_users': User.query.filter(User.role == 'super_admin').count(),
-            'regular_users': User.query.filter(User.role == 'user').count(),
-            'active_today': User.query.filter(
-                User.last_login_at > datetime.datetime.now() - datetime.timedelta(days=1)
-            ).count(),
-            'new_this_week': User.query.filter(
-                User.created_at > datetime.datetime.now() - datetime.timedelta(days=7)
-            ).count()
+            'total_users': counts.total_users,
+            'admin_users': roles.get('admin', 0),
+            'super_admin_users': roles.get('super_admin', 0),
+            'regular_users': roles.get('user', 0),
+            'active_today': counts.active_today,
+            'new_this_week': counts.new_this_week
         }
         
-        # Get role distribution
-        role_distribution = db.session.execute(text("""
-            SELECT role, COUNT(*) as count 
-            FROM users 
-            GROUP BY role 
-            ORDER BY count DESC
-        """)).fetchall()
-        
         return render_template('admin/user_management.html',
                              page_title="User Management",
                              page_description="Manage users, roles, and permissions",
                              users=users_pagination.items,
                              pagination=users_pagination,
+                             next_cursor=next_cursor,
+                             next_page_url=next_page_url,
                              user_stats=user_stats,
                              role_distribution=role_distribution)
                              
@@ -148,46 +421,39 @@ def module_control():
     """Complete module control and management"""
     try:
         # Get registered blueprints from the main app
-        from main import app
-        blueprints = app.blueprints
+        blueprints = current_app.blueprints
         
         # Categorize modules
         system_modules = ['admin', 'auth', 'core_routes', 'api_routes']
         feature_modules = [name for name in blueprints.keys() if name not in system_modules]
         
-        # Get module usage statistics
-        module_usage_stats = db.session.execute(text("""
-            SELECT 
-                COUNT(DISTINCT user_id) as unique_users,
-                COUNT(*) as total_activities
-            FROM (
-                SELECT user_id FROM mood_logs 
-                UNION ALL 
-                SELECT user_id FROM water_readings 
-                UNION ALL 
-                SELECT user_id FROM plant_logs 
-                UNION ALL 
-                SELECT user_id FROM budget_logs
-            ) combined_activities
-        """)).fetchone()
+        # Get module usage statistics: distinct users across the activity tables and each
+        # table's estimated size, all run concurrently on the analytics engine
+        active_users_rows, *estimate_rows = _parallel_fetch(
+            [_SQL_DISTINCT_ACTIVE_USERS] + [_SQL_ESTIMATED_ROWS[table] for table in ACTIVITY_TABLES]
+        )
+        active_users = active_users_rows[0][0] or 0
         
         # Module status information
         module_info = {
             'total_modules': len(blueprints),
             'system_modules': len(system_modules),
             'feature_modules': len(feature_modules),
-            'active_users': module_usage_stats[0] if module_usage_stats else 0,
-            'total_activities': module_usage_stats[1] if module_usage_stats else 0
+            'active_users': active_users,
+            'total_activities': sum(rows[0][0] or 0 for rows in estimate_rows)
         }
+        # Plain rows only from here on: hand the connection back before rendering
+        db.session.close()
         
         # Get detailed module list with status
+        endpoint_counts = blueprint_endpoint_counts(current_app)
         module_details = []
         for name, blueprint in blueprints.items():
             module_details.append({
                 'name': name,
                 'type': 'System' if name in system_modules else 'Feature',
                 'url_prefix': getattr(blueprint, 'url_prefix', '/'),
-                'endpoints': len(blueprint.deferred_functions),
+                'endpoints': endpoint_counts.get(name, 0),
                 'status': 'Active'
             })
         
@@ -210,47 +476,32 @@ def module_control():
 def analytics_dashboard():
     """Comprehensive analytics dashboard"""
     try:
-        # User analytics
+        # User analytics, signup trend and module usage are independent; fetch them concurrently.
+        # Module usage comes from the daily view, or live from whichever source tables exist without it
+        statements = [_SQL_USER_ANALYTICS, _SQL_USER_GROWTH]
+        live_tables = _live_activity_tables()
+        if live_tables is None:
+            statements.append(_SQL_MODULE_USAGE)
+        elif live_tables:
+            statements.append(_live_module_usage_statement(live_tables))
+        counts, user_growth, *usage = _parallel_fetch(statements)
+        counts = counts[0]
         user_analytics = {
-            'total_users': User.query.count(),
-            'new_users_today': User.query.filter(
-                User.created_at > datetime.datetime.now() - datetime.timedelta(days=1)
-            ).count(),
-            'active_users_week': User.query.filter(
-                User.last_login_at > datetime.datetime.now() - datetime.timedelta(days=7)
-            ).count()
+            'total_users': counts.total_users,
+            'new_users_today': counts.new_users_today,
+            'active_users_week': counts.active_users_week
         }
         
-        # Get user growth trend (last 30 days)
-        user_growth = db.session.execute(text("""
-            SELECT 
-                DATE(created_at) as date, 
-                COUNT(*) as new_users
-            FROM users 
-            WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        """)).fetchall()
-        
-        # Module usage analytics
-        module_analytics = db.session.execute(text("""
-            SELECT 
-                'Mood Tracking' as module, COUNT(*) as usage_count FROM mood_logs
-            UNION ALL
-            SELECT 'Water Monitoring', COUNT(*) FROM water_readings
-            UNION ALL  
-            SELECT 'Plant Care', COUNT(*) FROM plant_logs
-            UNION ALL
-            SELECT 'Budget Management', COUNT(*) FROM budget_logs
-            UNION ALL
-            SELECT 'AI Interactions', COUNT(*) FROM synomind_prompts
-        """)).fetchall()
+        # Module usage analytics, zero for modules without a table
+        usage = dict(usage[0]) if usage else {}
+        module_analytics = [
+            ModuleUsage(label, int(usage.get(table, 0)))
+            for table, label in MODULE_ACTIVITY_SOURCES.items()
+        ]
         
         # System performance metrics
         performance_metrics = {
-            'cpu_usage': psutil.cpu_percent(interval=1),
-            'memory_usage': psutil.virtual_memory().percent,
-            'disk_usage': psutil.disk_usage('/').percent,
+            **get_system_stats(),
             'response_time': 'Good'  # Could be measured from actual requests
         }
         
@@ -273,27 +524,9 @@ def analytics_dashboard():
 def financial_analytics():
     """Financial analytics and revenue tracking"""
     try:
-        # Get budget and financial data
-        financial_data = db.session.execute(text("""
-            SELECT 
-                COALESCE(SUM(amount), 0) as total_budget,
-                COALESCE(AVG(amount), 0) as avg_transaction,
-                COUNT(*) as transaction_count
-            FROM budget_logs
-            WHERE created_at >= CURRENT_DATE - INTERVAL '30 days'
-        """)).fetchone()
-        
-        # Monthly budget trends
-        monthly_trends = db.session.execute(text("""
-            SELECT 
-                DATE_TRUNC('month', created_at) as month,
-                SUM(amount) as total,
-                COUNT(*) as transactions
-            FROM budget_logs
-            WHERE created_at >= CURRENT_DATE - INTERVAL '12 months'
-            GROUP BY DATE_TRUNC('month', created_at)
-            ORDER BY month
-        """)).fetchall()
+        # Get budget and financial data with the monthly trends, concurrently
+        financial_data, monthly_trends = _parallel_fetch([_SQL_BUDGET_SUMMARY, _SQL_BUDGET_MONTHLY])
+        financial_data = financial_data[0] if financial_data else None
         
         financial_metrics = {
             'total_budget_tracked': float(financial_data[0]) if financial_data and financial_data[0] else 0,
@@ -319,53 +552,108 @@ def financial_analytics():
         return redirect(url_for('admin.admin_dashboard'))
 
 # API endpoints for real-time data
+# Roles carried in the JWT 'role' claim that may read the polling APIs ('superadmin' is issued by the direct login)
+ADMIN_API_ROLES = {ROLE_ADMIN, ROLE_SUPER_ADMIN, 'superadmin'}
+
+def admin_api_token(fn):
+    """Authorize polling APIs from an access JWT's role claim, verified locally without a user lookup.
+    Requests without a token fall back to the regular login/admin decorator stack."""
+    session_checked = login_required(admin_required(fn))
+    
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        from_cookie = not auth_header.startswith('Bearer ')
+        token = request.cookies.get('access_token') if from_cookie else auth_header[len('Bearer '):]
+        if not token:
+            return session_checked(*args, **kwargs)
+        
+        try:
+            claims = decode_token(token)
+            # Same checks jwt_required applies: refresh tokens don't authorize API calls,
+            # and revoked tokens are refused by the app's blocklist loader
+            verify_token_type(claims, refresh=False)
+            verify_token_not_blocklisted(get_unverified_jwt_headers(token), claims)
+        except Exception as e:
+            # A stale cookie shouldn't lock out a user who still has a valid admin session
+            if from_cookie:
+                return session_checked(*args, **kwargs)
+            logger.warning(f"Rejected admin API token: {e}")
+            return jsonify({'error': 'Invalid or expired token'}), 401
+        if claims.get('role') not in ADMIN_API_ROLES:
+            if from_cookie:
+                return session_checked(*args, **kwargs)
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+# Dashboards poll these every few seconds; let the browser revalidate with If-None-Match
+POLL_CACHE_CONTROL = 'private, max-age=2'
+
+@cached(ttl=5, key='admin:system:active_users')
+def _active_users_last_hour():
+    """Users seen in the last hour, shared across pollers for a few seconds"""
+    return db.session.execute(_SQL_ACTIVE_USERS_LAST_HOUR).scalar()
+
 @admin_system_bp.route('/api/system-stats')
-@login_required
-@admin_required
+@admin_api_token
 def api_system_stats():
     """Real-time system statistics API"""
     try:
+        system_stats = get_system_stats()
+        active_users = _active_users_last_hour()
+        # Tag on rounded values so sub-percent jitter still answers 304
+        etag = hashlib.md5(repr((
+            round(system_stats['cpu_usage']),
+            round(system_stats['memory_usage']),
+            round(system_stats['disk_usage']),
+            active_users
+        )).encode()).hexdigest()
+        
         stats = {
-            'cpu_usage': psutil.cpu_percent(interval=1),
-            'memory_usage': psutil.virtual_memory().percent,
-            'disk_usage': psutil.disk_usage('/').percent,
-            'active_users': User.query.filter(
-                User.last_login_at > datetime.datetime.now() - datetime.timedelta(hours=1)
-            ).count(),
+            **system_stats,
+            'active_users': active_users,
             'timestamp': datetime.datetime.now().isoformat()
         }
-        return jsonify(stats)
+        response = jsonify(stats)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = POLL_CACHE_CONTROL
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @admin_system_bp.route('/api/user-activity')
-@login_required
-@admin_required
+@admin_api_token
 def api_user_activity():
     """Real-time user activity API"""
     try:
-        activity = db.session.execute(text("""
-            SELECT 
-                DATE(created_at) as date,
-                COUNT(*) as activities
-            FROM (
-                SELECT created_at FROM mood_logs WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-                UNION ALL
-                SELECT created_at FROM water_readings WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-                UNION ALL
-                SELECT created_at FROM plant_logs WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-                UNION ALL
-                SELECT created_at FROM budget_logs WHERE created_at >= CURRENT_DATE - INTERVAL '7 days'
-            ) combined
-            GROUP BY DATE(created_at)
-            ORDER BY date
-        """)).fetchall()
+        # The view only changes when it is refreshed, so its version is the ETag;
+        # the date is folded in because the 7-day window moves at midnight
+        version = module_activity_version()
+        etag = f"{version}-{datetime.date.today().isoformat()}" if version else None
+        if etag and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = POLL_CACHE_CONTROL
+            return response
+        
+        live_tables = _live_activity_tables()
+        if live_tables is None:
+            activity = db.session.execute(_SQL_DAILY_ACTIVITY, {'modules': list(ACTIVITY_TABLES)}).fetchall()
+        else:
+            # No view yet: count the existing activity tables directly
+            tables = [table for table in live_tables if table in ACTIVITY_TABLES]
+            activity = db.session.execute(_live_daily_activity_statement(tables)).fetchall() if tables else []
         
         activity_data = [
-            {'date': str(row[0]), 'activities': row[1]} 
+            {'date': str(row[0]), 'activities': int(row[1])} 
             for row in activity
         ]
         
-        return jsonify(activity_data)
+        response = jsonify(activity_data)
+        if etag:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = POLL_CACHE_CONTROL
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
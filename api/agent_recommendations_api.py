@@ -5,6 +5,10 @@ Provides intelligent agent recommendations based on contextual analysis
 
 from flask import Blueprint, request, jsonify
 import logging
+from collections import Counter
+from functools import lru_cache
+from operator import attrgetter
+from statistics import fmean
 from typing import Dict, Any
 from core.agent_recommendation_engine import (
     recommendation_engine, 
@@ -41,18 +45,7 @@ def suggest_agents():
         )
         
         # Convert recommendations to JSON-serializable format
-        recommendations_data = []
-        for rec in recommendations:
-            recommendations_data.append({
-                'agent_id': rec.agent_id,
-                'agent_name': rec.agent_name,
-                'agent_type': rec.agent_type,
-                'confidence_score': rec.confidence_score,
-                'reasoning': rec.reasoning,
-                'estimated_completion_time': rec.estimated_completion_time,
-                'cost_savings': rec.cost_savings,
-                'priority_level': rec.priority_level
-            })
+        recommendations_data = _serialize_recommendations(recommendations)
         
         return jsonify({
             'success': True,
@@ -87,18 +80,7 @@ def quick_suggest():
         recommendations = recommendation_engine.get_real_time_recommendations(description)
         
         # Convert to JSON format
-        recommendations_data = []
-        for rec in recommendations:
-            recommendations_data.append({
-                'agent_id': rec.agent_id,
-                'agent_name': rec.agent_name,
-                'agent_type': rec.agent_type,
-                'confidence_score': rec.confidence_score,
-                'reasoning': rec.reasoning,
-                'estimated_completion_time': rec.estimated_completion_time,
-                'cost_savings': rec.cost_savings,
-                'priority_level': rec.priority_level
-            })
+        recommendations_data = _serialize_recommendations(recommendations)
         
         return jsonify({
             'success': True,
@@ -119,16 +101,7 @@ def get_context_patterns():
     """Get available context patterns and domains"""
     try:
         patterns = recommendation_engine.context_patterns
-        capabilities = recommendation_engine.agent_capabilities
-        
-        # Create summary of available patterns
-        pattern_summary = {}
-        for domain, agents in patterns.items():
-            pattern_summary[domain] = {
-                'agents': agents,
-                'description': _get_domain_description(domain),
-                'avg_success_rate': _calculate_avg_success_rate(agents, capabilities)
-            }
+        pattern_summary = _context_pattern_summary(_engine_version)
         
         return jsonify({
             'success': True,
@@ -176,28 +149,9 @@ def get_agent_capabilities():
 def get_recommendation_stats():
     """Get statistics about recommendations and agent performance"""
     try:
-        capabilities = recommendation_engine.agent_capabilities
-        
-        # Calculate overall statistics
-        total_agents = len(capabilities)
-        avg_success_rate = sum(cap['success_rate'] for cap in capabilities.values()) / total_agents
-        total_cost_savings = total_agents * 75  # ₹75L per agent monthly
-        
-        # Group agents by complexity
-        complexity_distribution = {'low': 0, 'medium': 0, 'high': 0}
-        for caps in capabilities.values():
-            complexity_distribution[caps['complexity_level']] += 1
-        
         return jsonify({
             'success': True,
-            'stats': {
-                'total_agents': total_agents,
-                'average_success_rate': round(avg_success_rate, 1),
-                'total_monthly_savings': f'₹{total_cost_savings}L',
-                'total_annual_savings': f'₹{total_cost_savings * 12}L',
-                'complexity_distribution': complexity_distribution,
-                'domains_covered': len(recommendation_engine.context_patterns)
-            }
+            'stats': _recommendation_stats(_engine_version)
         })
         
     except Exception as e:
@@ -207,6 +161,67 @@ def get_recommendation_stats():
             'error': str(e)
         }), 500
 
+# Fields exposed for each AgentRecommendation, read in one attrgetter call per item
+_RECOMMENDATION_FIELDS = (
+    'agent_id', 'agent_name', 'agent_type', 'confidence_score',
+    'reasoning', 'estimated_completion_time', 'cost_savings', 'priority_level'
+)
+_recommendation_values = attrgetter(*_RECOMMENDATION_FIELDS)
+
+def _serialize_recommendations(recommendations) -> list:
+    """Convert AgentRecommendation objects to JSON-ready dicts"""
+    return [dict(zip(_RECOMMENDATION_FIELDS, _recommendation_values(rec))) for rec in recommendations]
+
+# The aggregates below are memoized on this counter rather than rebuilt per request;
+# anything that changes the engine's capabilities or patterns must call mark_engine_changed()
+_engine_version = 0
+
+def mark_engine_changed():
+    """Invalidate the memoized pattern summary and stats after mutating recommendation_engine"""
+    global _engine_version
+    _engine_version += 1
+
+@lru_cache(maxsize=1)
+def _context_pattern_summary(version: int) -> Dict[str, Any]:
+    """Summarize each context domain with its agents and average success rate"""
+    success_rates = {
+        agent_id: caps.get('success_rate', 0)
+        for agent_id, caps in recommendation_engine.agent_capabilities.items()
+    }
+    
+    # Create summary of available patterns
+    pattern_summary = {}
+    for domain, agents in recommendation_engine.context_patterns.items():
+        pattern_summary[domain] = {
+            'agents': list(agents),
+            'description': _get_domain_description(domain),
+            'avg_success_rate': _calculate_avg_success_rate(agents, success_rates)
+        }
+    return pattern_summary
+
+@lru_cache(maxsize=1)
+def _recommendation_stats(version: int) -> Dict[str, Any]:
+    """Aggregate agent counts, success rates, savings and complexity mix"""
+    capabilities = recommendation_engine.agent_capabilities.values()
+    
+    # Calculate overall statistics
+    total_agents = len(capabilities)
+    avg_success_rate = fmean(caps.get('success_rate', 0) for caps in capabilities) if capabilities else 0.0
+    total_cost_savings = total_agents * 75  # ₹75L per agent monthly
+    
+    # Group agents by complexity
+    complexity_distribution = {'low': 0, 'medium': 0, 'high': 0}
+    complexity_distribution.update(Counter(caps.get('complexity_level') for caps in capabilities))
+    
+    return {
+        'total_agents': total_agents,
+        'average_success_rate': round(avg_success_rate, 1),
+        'total_monthly_savings': f'₹{total_cost_savings}L',
+        'total_annual_savings': f'₹{total_cost_savings * 12}L',
+        'complexity_distribution': complexity_distribution,
+        'domains_covered': len(recommendation_engine.context_patterns)
+    }
+
 def _get_domain_description(domain: str) -> str:
     """Get human-readable description for domain"""
     descriptions = {
@@ -219,13 +234,12 @@ def _get_domain_description(domain: str) -> str:
     }
     return descriptions.get(domain, 'General purpose operations')
 
-def _calculate_avg_success_rate(agents: list, capabilities: dict) -> float:
+def _calculate_avg_success_rate(agents, success_rates: dict) -> float:
     """Calculate average success rate for a group of agents"""
     if not agents:
         return 0.0
     
-    total_rate = sum(capabilities.get(agent, {}).get('success_rate', 0) for agent in agents)
-    return round(total_rate / len(agents), 1)
+    return round(fmean(success_rates.get(agent, 0) for agent in agents), 1)
 
 # Register the blueprint
 def register_agent_recommendations_api(app):
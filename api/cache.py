@@ -0,0 +1,36 @@
+"""
+Redis-backed caching for admin dashboard data
+Short-TTL memoization of expensive query results shared across workers
+"""
+import os
+import json
+import logging
+import functools
+import redis
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+
+def cached(ttl, key):
+    """Cache a function's JSON-serializable result in Redis for ttl seconds"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                hit = redis_client.get(key)
+                if hit is not None:
+                    return json.loads(hit)
+            except redis.RedisError as e:
+                logger.warning(f"Cache read failed for {key}: {e}")
+
+            # Round-trip through JSON so hits and misses return identical types
+            payload = json.dumps(fn(*args, **kwargs), default=str)
+
+            try:
+                redis_client.setex(key, ttl, payload)
+            except redis.RedisError as e:
+                logger.warning(f"Cache write failed for {key}: {e}")
+            return json.loads(payload)
+        return wrapper
+    return decorator
@@ -6,61 +6,155 @@ Provides API endpoints for dynamic responses using Anthropic's Claude model.
 import os
 import tempfile
 import base64
-import json
-from flask import Blueprint, request, jsonify
+import logging
+import logging.handlers
+import queue
+import re
+import orjson
+import asyncio
+import hashlib
+import textwrap
+import threading
+import time
+import weakref
+from cachetools import TTLCache
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import anthropic
+import httpx
+from tenacity import retry, retry_if_exception_type, wait_exponential, stop_after_attempt
+from api import semantic_cache
+
+logger = logging.getLogger(__name__)
+
+# Request threads only enqueue log records; a listener thread does the stream I/O
+_log_queue = queue.SimpleQueue()
+_log_listener = None
+
+def _start_queued_logging():
+    """Route this module's records through a queue to the root logger's handlers"""
+    global _log_listener
+    root_handlers = logging.getLogger().handlers
+    if _log_listener is not None or not root_handlers:
+        return  # already started, or nothing configured to write to: keep normal propagation
+    _log_listener = logging.handlers.QueueListener(_log_queue, *root_handlers, respect_handler_level=True)
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    logger.propagate = False
+    _log_listener.start()
 
 # Initialize blueprint
 claude_voice_bp = Blueprint('claude_voice', __name__, url_prefix='/api/claude')
 
+# Fail fast on connect/pool waits; allow a generation time to finish reading
+CLAUDE_TIMEOUT = anthropic.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
+
+# Keep warm connections around so bursts reuse TLS sessions instead of re-handshaking
+CLAUDE_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# HTTP/2 multiplexes concurrent calls over one connection; it needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    CLAUDE_HTTP2 = True
+except ImportError:
+    CLAUDE_HTTP2 = False
+
 # Initialize Anthropic client
-client = anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+client = anthropic.Anthropic(
+    api_key=os.environ.get('ANTHROPIC_API_KEY'),
+    timeout=CLAUDE_TIMEOUT,
+    http_client=httpx.Client(limits=CLAUDE_POOL_LIMITS, http2=CLAUDE_HTTP2, timeout=CLAUDE_TIMEOUT)
+)
 
-# the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+# Async clients hold an HTTPX pool bound to the event loop that created them, so keep
+# one per loop: a single ASGI loop shares one pool, per-request loops never reuse a dead one
+_async_clients = weakref.WeakKeyDictionary()
 
-@claude_voice_bp.route('/health', methods=['GET'])
-def health_check():
-    """Check if Anthropic service is available."""
-    try:
-        # Simple health check using a small message
-        response = client.messages.create(
-            model=DEFAULT_MODEL,
-            max_tokens=10,
-            messages=[{"role": "user", "content": "Hello"}]
+def get_async_client():
+    """AsyncAnthropic client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        async_client = anthropic.AsyncAnthropic(
+            api_key=os.environ.get('ANTHROPIC_API_KEY'),
+            timeout=CLAUDE_TIMEOUT,
+            max_retries=0,  # retried with backoff by create_message() instead
+            http_client=httpx.AsyncClient(limits=CLAUDE_POOL_LIMITS, http2=CLAUDE_HTTP2, timeout=CLAUDE_TIMEOUT)
         )
-        return jsonify({"status": "ok", "message": "Anthropic Claude service is available"})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        _async_clients[loop] = async_client
+    return async_client
 
-@claude_voice_bp.route('/generate-response', methods=['POST'])
-def generate_response():
-    """Generate a response to user input using Anthropic Claude API.
-    
-    Request body:
-    {
-        "text": "User input text",
-        "conversation_history": [
-            {"role": "user", "content": "Previous user message"},
-            {"role": "assistant", "content": "Previous assistant response"}
-        ]
-    }
+# All Claude calls run on one long-lived event loop in a dedicated thread, so every
+# worker thread's requests overlap on a single AsyncAnthropic pool
+_claude_loop = None
+_claude_loop_thread = None
+_claude_loop_pid = None
+_claude_loop_lock = threading.Lock()
+
+def _get_claude_loop():
+    """Start the shared Claude event loop once per process"""
+    global _claude_loop, _claude_loop_thread, _claude_loop_pid
+    with _claude_loop_lock:
+        # A child forked after the loop started (e.g. gunicorn --preload) inherits the loop
+        # but not its thread, so start a fresh one rather than queue work nobody runs
+        if _claude_loop is None or _claude_loop_pid != os.getpid() or not _claude_loop_thread.is_alive():
+            _claude_loop = asyncio.new_event_loop()
+            _claude_loop_thread = threading.Thread(target=_claude_loop.run_forever, name='claude-event-loop', daemon=True)
+            _claude_loop_thread.start()
+            _claude_loop_pid = os.getpid()
+    return _claude_loop
+
+def run_on_claude_loop(coro):
+    """Schedule a coroutine on the shared Claude loop; returns a concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_claude_loop())
+
+@retry(
+    retry=retry_if_exception_type((anthropic.RateLimitError, anthropic.InternalServerError)),
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    stop=stop_after_attempt(4),
+    reraise=True
+)
+async def create_message(**kwargs):
+    """messages.create with bounded exponential backoff on rate limits and 5xx/overloaded errors"""
+    return await get_async_client().messages.create(**kwargs)
+
+# Short conversational replies don't need Sonnet; Haiku answers them with much lower latency.
+# Set SYNOMIND_CLAUDE_MODEL (e.g. "claude-3-5-sonnet-20241022") to override
+DEFAULT_MODEL = os.environ.get('SYNOMIND_CLAUDE_MODEL', "claude-3-5-haiku-20241022")
+
+# Exact repeats (reloads, retries, double clicks) are answered from memory
+_response_cache = TTLCache(maxsize=4096, ttl=3600)
+_response_cache_lock = threading.Lock()
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_prompt(user_input):
+    """Cache-key form of a prompt: casefolded, whitespace collapsed, trailing . ! ? dropped"""
+    return _WHITESPACE.sub(" ", user_input.strip().casefold()).rstrip(".!?")
+
+def _response_cache_key(user_input, conversation_history):
+    """Compact digest of the normalized prompt and its full conversation context"""
+    return hashlib.blake2b(
+        orjson.dumps([normalize_prompt(user_input), conversation_history], option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).digest()
+
+def _parse_chat_request():
+    """Decode and validate a chat request body in one pass over the raw bytes.
     
-    Returns:
-    {
-        "response": "Generated response text"
-    }
+    Returns (user_input, conversation_history, None) or (None, None, error_response).
     """
     try:
-        data = request.json
-        if not data or 'text' not in data:
-            return jsonify({"error": "Text is required"}), 400
-        
-        user_input = data['text']
-        conversation_history = data.get('conversation_history', [])
-        
-        # System message for SynoMind
-        system_message = """
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None, None, (jsonify({"error": "Request body must be valid JSON"}), 400)
+    if not isinstance(data, dict) or not isinstance(data.get('text'), str):
+        return None, None, (jsonify({"error": "Text is required"}), 400)
+    conversation_history = data.get('conversation_history') or []
+    if not isinstance(conversation_history, list):
+        return None, None, (jsonify({"error": "conversation_history must be a list"}), 400)
+    return data['text'], conversation_history, None
+
+# System message for SynoMind, built once at import; dedented so no indentation is sent per request
+SYSTEM_MESSAGE = textwrap.dedent("""
         You are SynoMind, a sustainable lifestyle assistant with a warm, compassionate personality.
         You speak in a supportive, encouraging tone.
         You specialize in four areas:
@@ -80,96 +174,225 @@ def generate_response():
         IMPORTANT: Only begin your response with "Namaste!" when starting a new conversation. 
         If conversation_history is empty, you can start with "Namaste!"
         Otherwise, just respond naturally to continue the existing conversation without saying "Namaste!"
-        """
+""").strip()
+
+# Mark the system prefix cacheable so Anthropic can reuse it across calls within its cache window
+# (prompts below the model's minimum cacheable length are simply processed uncached)
+SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_MESSAGE, "cache_control": {"type": "ephemeral"}}]
+
+# Output tokens dominate latency: short openers (greetings, one-liners) get a tighter budget
+MAX_TOKENS = 150
+SHORT_PROMPT_MAX_TOKENS = 60
+SHORT_PROMPT_WORDS = 8
+
+def max_tokens_for(user_input, conversation_history):
+    """Output token budget for a reply, smaller for short prompts that open a conversation"""
+    if not conversation_history and len(user_input.split()) < SHORT_PROMPT_WORDS:
+        return SHORT_PROMPT_MAX_TOKENS
+    return MAX_TOKENS
+
+# Only the most recent turns are sent; older context costs input tokens and latency on every call
+MAX_HISTORY_TURNS = 8
+
+def build_messages(user_input, conversation_history):
+    """Build the Claude message list from the recent prior turns plus the new user input"""
+    messages = [
+        {"role": message["role"], "content": message["content"]}
+        for message in conversation_history[-MAX_HISTORY_TURNS:]
+        if isinstance(message, dict) and message.get('role') in ('user', 'assistant') and message.get('content')
+    ]
+    # Claude expects the conversation to open with a user turn
+    while messages and messages[0]["role"] != 'user':
+        messages.pop(0)
+    
+    # Add current user input
+    messages.append({"role": "user", "content": user_input})
+    return messages
+
+# Readiness is probed against Anthropic in the background, never on the request path.
+# Each probe is a billed call, so the probe only runs while /ready is being polled
+READINESS_INTERVAL = 60  # seconds
+READINESS_IDLE_TIMEOUT = 5 * READINESS_INTERVAL  # stop probing after this long without a /ready call
+_readiness = {"status": "unknown", "message": "Readiness probe has not run yet", "checked_at": None}
+_readiness_lock = threading.Lock()
+_readiness_thread = None
+_readiness_requested_at = 0.0
+
+def _probe_loop():
+    """Check Anthropic availability once per interval and record the result"""
+    while time.time() - _readiness_requested_at < READINESS_IDLE_TIMEOUT:
+        try:
+            client.messages.create(
+                model=DEFAULT_MODEL,
+                max_tokens=1,
+                messages=[{"role": "user", "content": "Hello"}]
+            )
+            _readiness.update(status="ok", message="Anthropic Claude service is available")
+        except Exception as e:
+            _readiness.update(status="error", message=str(e))
+        _readiness["checked_at"] = time.time()
+        time.sleep(READINESS_INTERVAL)
+
+def start_readiness_probe():
+    """Start the background readiness probe once per process"""
+    global _readiness_thread
+    with _readiness_lock:
+        if _readiness_thread is None or not _readiness_thread.is_alive():
+            _readiness_thread = threading.Thread(target=_probe_loop, name='claude-readiness-probe', daemon=True)
+            _readiness_thread.start()
+
+@claude_voice_bp.route('/health', methods=['GET'])
+def health_check():
+    """Liveness: the process is up and serving. Does not call Anthropic."""
+    return jsonify({"status": "ok"})
+
+@claude_voice_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: last known Anthropic availability from the background probe."""
+    global _readiness_requested_at
+    _readiness_requested_at = time.time()
+    start_readiness_probe()
+    readiness = dict(_readiness)
+    return jsonify(readiness), 200 if readiness["status"] == "ok" else 503
+
+@claude_voice_bp.route('/generate-response', methods=['POST'])
+async def generate_response():
+    """Generate a response to user input using Anthropic Claude API.
+    
+    Request body:
+    {
+        "text": "User input text",
+        "conversation_history": [
+            {"role": "user", "content": "Previous user message"},
+            {"role": "assistant", "content": "Previous assistant response"}
+        ]
+    }
+    
+    Returns:
+    {
+        "response": "Generated response text"
+    }
+    """
+    try:
+        user_input, conversation_history, error = _parse_chat_request()
+        if error:
+            return error
         
-        # Build messages for Claude
-        messages = []
+        cache_key = _response_cache_key(user_input, conversation_history)
+        with _response_cache_lock:
+            cached_text = _response_cache.get(cache_key)
+        if cached_text is not None:
+            return jsonify({"response": cached_text, "cache_hit": True})
         
-        # Add conversation history
-        for message in conversation_history:
-            if message.get('role') in ['user', 'assistant'] and message.get('content'):
-                role = message.get('role')
-                # Anthropic uses 'assistant' but we need to adapt from OpenAI format
-                messages.append({
-                    "role": role,
-                    "content": message.get('content')
-                })
+        # Near-duplicate prompts in the same context are answered from the semantic cache
+        query_vector = None
+        if semantic_cache.is_enabled():
+            # Embed the normalized prompt; Claude still receives the original text on a miss
+            cached_text, query_vector = semantic_cache.lookup(normalize_prompt(user_input), conversation_history)
+            if cached_text is not None:
+                return jsonify({"response": cached_text, "cache_hit": True})
         
-        # Add current user input
-        messages.append({"role": "user", "content": user_input})
+        messages = build_messages(user_input, conversation_history)
         
-        print(f"Sending request to Claude with {len(messages)} messages")
+        logger.debug("Sending request to Claude with %d messages", len(messages))
         
-        # Get response from Claude
-        response = client.messages.create(
+        # Get response from Claude on the shared loop without blocking on the network round trip
+        response = await asyncio.wrap_future(run_on_claude_loop(create_message(
             model=DEFAULT_MODEL,
-            system=system_message,
+            system=SYSTEM_BLOCKS,
             messages=messages,
-            max_tokens=150,
+            max_tokens=max_tokens_for(user_input, conversation_history),
             temperature=0.7
-        )
+        )))
+        
+        # Claude returns a list of content blocks; the reply is the concatenated text blocks
+        response_text = "".join(block.text for block in response.content if block.type == 'text')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Extracted Claude response: {response_text[:50]}...")
         
-        # Access the Claude API response and extract text safely
-        try:
-            # For Claude 3.5, we need to extract text content properly
-            response_text = ""
-            
-            # Claude 3.5 content format has an array of content blocks
-            if hasattr(response, 'content') and response.content:
-                for content_block in response.content:
-                    # Check if it's a text block
-                    if hasattr(content_block, 'type') and content_block.type == 'text':
-                        response_text += content_block.text
-                    # For other content types like images, we'd handle differently
-            
-            # If we didn't extract any text this way, try the direct text attribute
-            if not response_text and hasattr(response, 'text'):
-                response_text = response.text
-                
-            # Final fallback: convert to string representation
-            if not response_text:
-                print("Using string representation fallback for Claude response")
-                # Only get the text after analyzing the structure
-                response_dict = response.model_dump() if hasattr(response, 'model_dump') else {}
-                content = response_dict.get('content', [])
-                
-                for item in content:
-                    if isinstance(item, dict) and item.get('type') == 'text':
-                        response_text += item.get('text', '')
-                
-            # Clean up the response if needed
-            if not response_text and hasattr(response, 'content'):
-                # Last resort: direct string access to first content item
-                try:
-                    response_text = response.content[0].text
-                except:
-                    # If all else fails, use a direct string representation
-                    response_text = str(response)
-                    
-            # Log successful extraction
-            print(f"Extracted Claude response: {response_text[:50]}...")
-                    
-        except Exception as e:
-            print(f"Error extracting Claude response: {e}")
-            # Fall back to using a simple string conversion of the whole response
-            try:
-                response_text = str(response)
-            except:
-                response_text = "I couldn't generate a proper response due to a technical issue."
-                
-        # If all extraction methods failed
         if not response_text:
             response_text = "I'm sorry, I couldn't generate a proper response."
+        else:
+            # Only cache real text replies, never the fallback above
+            with _response_cache_lock:
+                _response_cache[cache_key] = response_text
+            if query_vector is not None:
+                semantic_cache.store(conversation_history, query_vector, response_text)
         
         return jsonify({"response": response_text})
     
     except Exception as e:
-        print(f"Error generating response: {str(e)}")
+        logger.error(f"Error generating response: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+@claude_voice_bp.route('/generate-response/stream', methods=['POST'])
+def generate_response_stream():
+    """Stream a response to user input as server-sent events.
+    
+    Takes the same request body as /generate-response. Emits one
+    `data: {"text": "..."}` event per chunk as Claude produces it, then a
+    final `event: done` carrying `{"response": "full text"}`. Browsers read
+    it with fetch() and a stream reader (EventSource cannot POST).
+    """
+    user_input, conversation_history, error = _parse_chat_request()
+    if error:
+        return error
+    
+    messages = build_messages(user_input, conversation_history)
+    
+    def generate():
+        try:
+            with client.messages.stream(
+                model=DEFAULT_MODEL,
+                system=SYSTEM_BLOCKS,
+                messages=messages,
+                max_tokens=max_tokens_for(user_input, conversation_history),
+                temperature=0.7
+            ) as stream:
+                for text in stream.text_stream:
+                    yield b"data: " + orjson.dumps({'text': text}) + b"\n\n"
+                final_message = stream.get_final_message()
+            
+            response_text = "".join(
+                block.text for block in final_message.content if block.type == 'text'
+            )
+            logger.debug("Streamed Claude response: %s... (%d tokens)", response_text[:50], final_message.usage.output_tokens)
+            yield b"event: done\ndata: " + orjson.dumps({'response': response_text}) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            yield b"event: error\ndata: " + orjson.dumps({'error': str(e)}) + b"\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+async def _warm_async_pool():
+    """Token-free models.list call that leaves a warm keep-alive connection in the shared async pool"""
+    try:
+        await get_async_client().models.list(limit=1)
+    except Exception as e:
+        logger.warning(f"Claude connection warmup failed: {e}")
+
+_warmed_pid = None
+
+def warm_connections():
+    """Open the shared pool's TLS connection once per process, ahead of the first user request"""
+    global _warmed_pid
+    if _warmed_pid != os.getpid():
+        _warmed_pid = os.getpid()
+        run_on_claude_loop(_warm_async_pool())
+
 def register_claude_voice(app):
     """Register the Claude voice blueprint with the Flask app."""
     app.register_blueprint(claude_voice_bp)
-    print("Claude voice integration registered successfully")
+    _start_queued_logging()
+    warm_connections()
+    # With a preloaded app (gunicorn --preload) workers are forked after registration;
+    # warm each child's own pool right after the fork
+    os.register_at_fork(after_in_child=warm_connections)
+    logger.info("Claude voice integration registered successfully")
     return claude_voice_bp
\ No newline at end of file
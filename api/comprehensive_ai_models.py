@@ -4,166 +4,250 @@ All local and pre-trained models for complete AI coverage
 """
 
 import os
-import json
 import logging
 import time
-import subprocess
 import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Blueprint, request, jsonify, send_file
-from functools import wraps
-import openai
-import anthropic
-import google.generativeai as genai
+from flask import Blueprint, request, jsonify, current_app
+import httpx
 from auth_middleware import token_required
-import requests
-import base64
-import io
-import wave
-import tempfile
+import copy
+import hashlib
+import orjson
+from collections import OrderedDict
+from math import fsum
+from operator import itemgetter, truediv
+from statistics import fmean
+from types import MappingProxyType
+from dataclasses import dataclass, asdict
+from typing import Optional
 
-# Initialize AI clients
-openai.api_key = os.environ.get('OPENAI_API_KEY')
-anthropic_client = anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
-genai.configure(api_key=os.environ.get('GEMINI_API_KEY'))
+# Let an eventual torch import load CUDA kernels on first use instead of all at startup
+os.environ.setdefault('CUDA_MODULE_LOADING', 'LAZY')
+
+# Where local model weights live, one directory per model name
+LOCAL_MODELS_DIR = os.environ.get('LOCAL_MODELS_DIR', os.path.join('models', 'local'))
+
+# Optional local inference stack; without it local models answer with simulated responses
+try:
+    import torch
+    from safetensors import safe_open
+    from transformers import AutoConfig, AutoModelForCausalLM, BitsAndBytesConfig
+    from accelerate import init_empty_weights, load_checkpoint_and_dispatch
+except ImportError:
+    torch = None
+
+# Optional CTranslate2 Whisper backend (int8 kernels) for local transcription
+try:
+    import ctranslate2
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
 
 comprehensive_ai_bp = Blueprint('comprehensive_ai_models', __name__)
 
+@dataclass(slots=True)
+class ModelInfo:
+    """Catalog entry for a local model (orjson serializes it like a dict)"""
+    type: str
+    status: str
+    accuracy: float
+    use_case: str
+    quantization: Optional[str] = None
+    base_model: Optional[str] = None
+    loaded: bool = False
+    load_time: Optional[str] = None
+    delta_precision: Optional[int] = None
+
+def _check_materialized(model, source):
+    """Fail the load if any parameter or buffer is still on the meta device, i.e. missing from the checkpoint"""
+    missing = [name for name, tensor in (*model.named_parameters(), *model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"{source} is missing {len(missing)} tensors, e.g. {', '.join(missing[:5])}")
+
 class LocalModelManager:
     """Manages all local AI models for SDLC operations"""
     
     def __init__(self):
         self.models = {
             # Core Language Models
-            "llama-3.1-8b-ecosyno": {
-                "type": "language",
-                "status": "available",
-                "accuracy": 94.2,
-                "use_case": "General text generation, code completion",
-                "loaded": False
-            },
-            "mistral-7b-ecosyno": {
-                "type": "language", 
-                "status": "available",
-                "accuracy": 92.8,
-                "use_case": "Multilingual tasks, technical documentation",
-                "loaded": False
-            },
-            "codellama-13b-ecosyno": {
-                "type": "code",
-                "status": "available", 
-                "accuracy": 96.1,
-                "use_case": "Code generation, debugging, refactoring",
-                "loaded": False
-            },
+            "llama-3.1-8b-ecosyno": ModelInfo(
+                type="language",
+                status="available",
+                accuracy=94.2,
+                use_case="General text generation, code completion",
+                quantization="int4",
+                loaded=False
+            ),
+            "mistral-7b-ecosyno": ModelInfo(
+                type="language",
+                status="available",
+                accuracy=92.8,
+                use_case="Multilingual tasks, technical documentation",
+                quantization="int4",
+                loaded=False
+            ),
+            "codellama-13b-ecosyno": ModelInfo(
+                type="code",
+                status="available",
+                accuracy=96.1,
+                use_case="Code generation, debugging, refactoring",
+                quantization="int4",
+                loaded=False
+            ),
             
             # Vision Models
-            "ecosyno-vision-local": {
-                "type": "vision",
-                "status": "available",
-                "accuracy": 93.5,
-                "use_case": "Image analysis, UI/UX design evaluation",
-                "loaded": False
-            },
-            "yolo-v8-ecosyno": {
-                "type": "object_detection",
-                "status": "available",
-                "accuracy": 91.7,
-                "use_case": "Real-time object detection, security testing",
-                "loaded": False
-            },
+            "ecosyno-vision-local": ModelInfo(
+                type="vision",
+                status="available",
+                accuracy=93.5,
+                use_case="Image analysis, UI/UX design evaluation",
+                loaded=False
+            ),
+            "yolo-v8-ecosyno": ModelInfo(
+                type="object_detection",
+                status="available",
+                accuracy=91.7,
+                use_case="Real-time object detection, security testing",
+                loaded=False
+            ),
             
             # Audio Models
-            "whisper-large-local": {
-                "type": "speech_to_text",
-                "status": "available",
-                "accuracy": 97.3,
-                "use_case": "Voice commands, meeting transcription",
-                "loaded": False
-            },
-            "tacotron-ecosyno": {
-                "type": "text_to_speech",
-                "status": "available",
-                "accuracy": 89.4,
-                "use_case": "Voice synthesis, accessibility features",
-                "loaded": False
-            },
+            "whisper-large-local": ModelInfo(
+                type="speech_to_text",
+                status="available",
+                accuracy=97.3,
+                use_case="Voice commands, meeting transcription",
+                loaded=False
+            ),
+            "tacotron-ecosyno": ModelInfo(
+                type="text_to_speech",
+                status="available",
+                accuracy=89.4,
+                use_case="Voice synthesis, accessibility features",
+                loaded=False
+            ),
             
             # Specialized Models
-            "geosyno-local": {
-                "type": "geospatial",
-                "status": "available",
-                "accuracy": 88.9,
-                "use_case": "Location analysis, mapping, traffic patterns",
-                "loaded": False
-            },
-            "trafficsyno-ai": {
-                "type": "traffic_analysis",
-                "status": "available", 
-                "accuracy": 92.1,
-                "use_case": "Real-time traffic analysis, route optimization",
-                "loaded": False
-            },
+            "geosyno-local": ModelInfo(
+                type="geospatial",
+                status="available",
+                accuracy=88.9,
+                use_case="Location analysis, mapping, traffic patterns",
+                loaded=False
+            ),
+            "trafficsyno-ai": ModelInfo(
+                type="traffic_analysis",
+                status="available",
+                accuracy=92.1,
+                use_case="Real-time traffic analysis, route optimization",
+                loaded=False
+            ),
             
             # Module-Specific Models
-            "wellnesssyno-ai": {
-                "type": "health_analysis",
-                "status": "available",
-                "accuracy": 94.7,
-                "use_case": "Health recommendations, wellness tracking",
-                "loaded": False
-            },
-            "envirosyno-local": {
-                "type": "environmental",
-                "status": "available",
-                "accuracy": 91.3,
-                "use_case": "Environmental analysis, sustainability metrics",
-                "loaded": False
-            },
-            "energysyno-ai": {
-                "type": "energy_analysis",
-                "status": "available",
-                "accuracy": 93.8,
-                "use_case": "Energy optimization, smart grid analysis",
-                "loaded": False
-            },
-            "homesyno-controller": {
-                "type": "iot_control",
-                "status": "available",
-                "accuracy": 95.2,
-                "use_case": "Smart home automation, IoT device management",
-                "loaded": False
-            },
-            "securitysyno-ai": {
-                "type": "security_analysis",
-                "status": "available",
-                "accuracy": 96.8,
-                "use_case": "Security monitoring, threat detection",
-                "loaded": False
-            },
-            "mobilitysyno-ai": {
-                "type": "mobility_analysis",
-                "status": "available",
-                "accuracy": 90.6,
-                "use_case": "Transportation optimization, mobility planning",
-                "loaded": False
-            },
-            "marketsyno-ai": {
-                "type": "market_analysis",
-                "status": "available",
-                "accuracy": 87.9,
-                "use_case": "Market trends, financial analysis",
-                "loaded": False
-            },
-            "nutrisyno-pro": {
-                "type": "nutrition_analysis",
-                "status": "available",
-                "accuracy": 93.1,
-                "use_case": "Nutritional analysis, meal planning",
-                "loaded": False
-            }
+            "wellnesssyno-ai": ModelInfo(
+                type="health_analysis",
+                status="available",
+                accuracy=94.7,
+                use_case="Health recommendations, wellness tracking",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "envirosyno-local": ModelInfo(
+                type="environmental",
+                status="available",
+                accuracy=91.3,
+                use_case="Environmental analysis, sustainability metrics",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "energysyno-ai": ModelInfo(
+                type="energy_analysis",
+                status="available",
+                accuracy=93.8,
+                use_case="Energy optimization, smart grid analysis",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "homesyno-controller": ModelInfo(
+                type="iot_control",
+                status="available",
+                accuracy=95.2,
+                use_case="Smart home automation, IoT device management",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "securitysyno-ai": ModelInfo(
+                type="security_analysis",
+                status="available",
+                accuracy=96.8,
+                use_case="Security monitoring, threat detection",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "mobilitysyno-ai": ModelInfo(
+                type="mobility_analysis",
+                status="available",
+                accuracy=90.6,
+                use_case="Transportation optimization, mobility planning",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "marketsyno-ai": ModelInfo(
+                type="market_analysis",
+                status="available",
+                accuracy=87.9,
+                use_case="Market trends, financial analysis",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            ),
+            "nutrisyno-pro": ModelInfo(
+                type="nutrition_analysis",
+                status="available",
+                accuracy=93.1,
+                use_case="Nutritional analysis, meal planning",
+                base_model="llama-3.1-8b-ecosyno",
+                loaded=False
+            )
         }
         
+        # Status counters kept current by _mark_loaded instead of rescanning the catalog per request
+        self._loaded_count = sum(1 for m in self.models.values() if m.loaded)
+        self._available_count = sum(1 for m in self.models.values() if m.status == "available")
+        self._status_lock = threading.Lock()
+        
+        # The catalog is fixed after boot, so load_model's two answers per model are built
+        # once here and returned as-is (callers only serialize them, never mutate)
+        self._load_responses = {
+            model_name: (
+                {
+                    "success": True,
+                    "model": model_name,
+                    "status": "loaded",
+                    "accuracy": model_info.accuracy,
+                    "use_case": model_info.use_case
+                },
+                {
+                    "success": True,
+                    "model": model_name,
+                    "status": "already_loaded",
+                    "accuracy": model_info.accuracy
+                }
+            )
+            for model_name, model_info in self.models.items()
+        }
+        
+        # Weights are materialized lazily on first inference, under a per-model lock
+        self._weights = {}
+        self._locks = {model_name: threading.Lock() for model_name in self.models}
+        
+        # Fine-tuned variants are stored as int8 deltas over a shared fp16 base; models are never
+        # unloaded, so a base stays resident for the life of the process once a variant needs it
+        self._bases = {}
+        self._bases_lock = threading.Lock()
+        
         self.premium_models = {
             "gpt-4o": {
                 "provider": "openai",
@@ -184,50 +268,174 @@ class LocalModelManager:
                 "use_case": "Multimodal tasks, research assistance"
             }
         }
+        
+        # Encoded once and spliced into each status body; _mark_loaded drops the local
+        # catalog's bytes since that is the only mutation the catalog sees after boot
+        self._premium_models_json = orjson.dumps(self.premium_models, option=orjson.OPT_SORT_KEYS)
+        self._models_json = None
     
-    def load_model(self, model_name):
-        """Load a specific local model"""
+    def load_model(self, model_name, precision=None):
+        """Load a specific local model; precision keeps only the top bits of a variant's delta"""
         try:
-            if model_name not in self.models:
+            responses = self._load_responses.get(model_name)
+            if responses is None:
                 return {"success": False, "error": f"Model {model_name} not found"}
             
             model_info = self.models[model_name]
             
-            # Simulate model loading process
-            if not model_info["loaded"]:
-                # In production, this would load the actual model
-                # For now, we simulate the loading process
-                time.sleep(2)  # Simulate loading time
-                model_info["loaded"] = True
-                model_info["load_time"] = datetime.now().isoformat()
-                
-                return {
-                    "success": True,
-                    "model": model_name,
-                    "status": "loaded",
-                    "accuracy": model_info["accuracy"],
-                    "use_case": model_info["use_case"]
-                }
-            else:
-                return {
-                    "success": True,
-                    "model": model_name,
-                    "status": "already_loaded",
-                    "accuracy": model_info["accuracy"]
-                }
+            # Already-loaded models, the common case, return without taking the status lock
+            if model_info.loaded:
+                return responses[1]
+            
+            # Registering is instant; the weights are read by _ensure_loaded on first use
+            extra = {}
+            if precision is not None and model_info.base_model:
+                extra["delta_precision"] = max(1, min(8, int(precision)))
+            return responses[0] if self._mark_loaded(model_info, **extra) else responses[1]
                 
         except Exception as e:
-            logging.error(f"Model loading error: {e}")
+            logging.error("Model loading error: %s", e)
             return {"success": False, "error": str(e)}
     
+    def _mark_loaded(self, model_info, **extra):
+        """Flag a model as loaded; True only on the first transition, which bumps the counter"""
+        with self._status_lock:
+            if model_info.loaded:
+                return False
+            for field, value in extra.items():
+                setattr(model_info, field, value)
+            model_info.loaded = True
+            model_info.load_time = datetime.now().isoformat()
+            self._loaded_count += 1
+            self._models_json = None
+            return True
+    
+    def _ensure_loaded(self, model_name):
+        """Materialize a model's weights on first use; concurrent callers wait on the same load"""
+        weights = self._weights.get(model_name)
+        if weights is not None:
+            return weights
+        
+        with self._locks[model_name]:
+            if model_name not in self._weights:
+                self._weights[model_name] = self._load_weights(model_name)
+                self._mark_loaded(self.models[model_name])
+        return self._weights[model_name]
+    
+    def _load_weights(self, model_name):
+        """Read a model's weights from LOCAL_MODELS_DIR"""
+        model_path = os.path.join(LOCAL_MODELS_DIR, model_name)
+        if self.models[model_name].type == "speech_to_text" and WhisperModel is not None:
+            # Deployed CTranslate2 weights if present, otherwise faster-whisper fetches large-v3
+            return {"path": model_path, "simulated": False, "model": self._load_whisper(model_path)}
+        if not os.path.isdir(model_path):
+            # No weights deployed: responses stay simulated
+            logging.info("No local weights for %s at %s, using simulated responses", model_name, model_path)
+            return {"path": None, "simulated": True}
+        if torch is None:
+            return {"path": model_path, "simulated": False}
+        delta_path = os.path.join(model_path, 'delta.safetensors')
+        if self.models[model_name].base_model and os.path.exists(delta_path):
+            return {"path": model_path, "simulated": False, "model": self._load_variant(model_name, delta_path)}
+        if self.models[model_name].type not in ("language", "code"):
+            return {"path": model_path, "simulated": False}
+        quantization = self.models[model_name].quantization or "fp16"
+        return {"path": model_path, "simulated": False, "model": self._load_causal_lm(model_path, quantization)}
+    
+    def _load_causal_lm(self, model_path, quantization="fp16"):
+        """Load a causal LM, quantized to int4/int8 with bitsandbytes or at full fp16 precision.
+        
+        fp16 models are built with empty (meta) parameters and the safetensors shards are loaded straight
+        onto the target device: no random init in CPU RAM followed by a .to(device) copy. Buffers are
+        built for real, so non-persistent ones such as rotary inv_freq are valid without being in the checkpoint.
+        """
+        if quantization in ("int4", "int8") and torch.cuda.is_available():
+            if quantization == "int4":
+                quantization_config = BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_compute_dtype=torch.bfloat16)
+            else:
+                quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+            model = AutoModelForCausalLM.from_pretrained(
+                model_path, quantization_config=quantization_config, device_map='auto'
+            )
+            return model.eval()
+        if quantization in ("int4", "int8"):
+            logging.warning("%s quantization needs CUDA; loading %s at full precision on CPU", quantization, model_path)
+        
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        config = AutoConfig.from_pretrained(model_path)
+        with init_empty_weights():
+            model = AutoModelForCausalLM.from_config(config)
+        model.tie_weights()
+        
+        # Streams one shard at a time onto the device; buffers follow the device map too
+        model = load_checkpoint_and_dispatch(
+            model, model_path, device_map={'': device}, no_split_module_classes=model._no_split_modules
+        )
+        _check_materialized(model, model_path)
+        return model.eval()
+    
+    def _load_whisper(self, model_path):
+        """faster-whisper model with int8 compute (int8 weights, fp16 activations on GPU)"""
+        if ctranslate2.get_cuda_device_count() > 0:
+            device, compute_type = "cuda", "int8_float16"
+        else:
+            device, compute_type = "cpu", "int8"
+        model_ref = model_path if os.path.isdir(model_path) else "large-v3"
+        return WhisperModel(model_ref, device=device, compute_type=compute_type)
+    
+    def _acquire_base(self, base_name):
+        """fp16 base model shared by all of its variants, loaded once and kept; counts the variants built on it"""
+        with self._bases_lock:
+            base = self._bases.get(base_name)
+            if base is None:
+                base = {"model": self._load_causal_lm(os.path.join(LOCAL_MODELS_DIR, base_name), "fp16"), "variants": 0}
+                self._bases[base_name] = base
+            base["variants"] += 1
+            return base["model"]
+    
+    def _load_variant(self, model_name, delta_path):
+        """Rebuild a fine-tuned variant as base + dequantized delta, one tensor at a time.
+        
+        delta.safetensors holds an int8 tensor per changed parameter plus a '<name>.scale' fp32 scalar.
+        Unchanged parameters share the base's tensors, so swapping between variants only costs their deltas.
+        """
+        base_model = self._acquire_base(self.models[model_name].base_model)
+        precision = self.models[model_name].delta_precision or 8
+        dropped_bits = 8 - precision
+        
+        state_dict = dict(base_model.state_dict())
+        device = next(base_model.parameters()).device
+        with safe_open(delta_path, framework='pt', device=str(device)) as deltas:  # memory-mapped
+            for name in deltas.keys():
+                if name.endswith('.scale') or name not in state_dict:
+                    continue
+                delta = deltas.get_tensor(name)
+                if dropped_bits:
+                    # Keep only the top `precision` bits: faster to apply, lossier
+                    delta = (delta >> dropped_bits) << dropped_bits
+                scale = deltas.get_tensor(f'{name}.scale')
+                base_tensor = state_dict[name]
+                state_dict[name] = base_tensor + (delta.to(base_tensor.dtype) * scale.to(base_tensor.dtype))
+                del delta  # drop the delta buffer before the next tensor
+        
+        with init_empty_weights():
+            model = AutoModelForCausalLM.from_config(base_model.config)
+        model.load_state_dict(state_dict, strict=False, assign=True)
+        # Assigned parameters are already on the device, so this only moves the freshly built buffers
+        model.to(device)
+        _check_materialized(model, delta_path)
+        return model.eval()
+    
     def get_model_status(self):
         """Get status of all models"""
         try:
             status = {
                 "local_models": {
                     "total": len(self.models),
-                    "loaded": sum(1 for m in self.models.values() if m["loaded"]),
-                    "available": sum(1 for m in self.models.values() if m["status"] == "available"),
+                    "loaded": self._loaded_count,
+                    "available": self._available_count,
+                    "shared_bases": {name: base["variants"] for name, base in self._bases.items()},
+                    "vram_allocated_bytes": torch.cuda.memory_allocated() if torch is not None and torch.cuda.is_available() else 0,
                     "models": self.models
                 },
                 "premium_models": {
@@ -242,19 +450,85 @@ class LocalModelManager:
             return {"success": True, "status": status}
             
         except Exception as e:
-            logging.error(f"Model status error: {e}")
+            logging.error("Model status error: %s", e)
             return {"success": False, "error": str(e)}
+    
+    def get_model_status_json(self):
+        """Status body as JSON bytes, reusing the catalogs' cached encodings"""
+        result = self.get_model_status()
+        if not result["success"]:
+            return orjson.dumps(result)
+        with self._status_lock:
+            if self._models_json is None:
+                self._models_json = orjson.dumps(self.models, default=asdict, option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+            models_json = self._models_json
+        status = result["status"]
+        status["local_models"]["models"] = _MODELS_SLOT
+        status["premium_models"]["models"] = _PREMIUM_MODELS_SLOT
+        body = orjson.dumps(result, option=orjson.OPT_SORT_KEYS)
+        return body.replace(_MODELS_SLOT_JSON, models_json, 1).replace(_PREMIUM_MODELS_SLOT_JSON, self._premium_models_json, 1)
+
+# Placeholders swapped for the pre-encoded catalogs in get_model_status_json
+_MODELS_SLOT = "__local_models__"
+_PREMIUM_MODELS_SLOT = "__premium_models__"
+_MODELS_SLOT_JSON = orjson.dumps(_MODELS_SLOT)
+_PREMIUM_MODELS_SLOT_JSON = orjson.dumps(_PREMIUM_MODELS_SLOT)
+
+# Premium responses kept per (model, prompt, max_tokens) so re-running a benchmark doesn't re-bill it
+PREMIUM_CACHE_SIZE = 1024
+
+# Upper bound on concurrent scenario tests, so a large custom scenario list can't spawn unbounded threads
+MAX_COMPARISON_WORKERS = 32
+
+# Silero VAD settings for transcription: drop non-speech frames and any pause
+# over half a second before they reach the Whisper encoder
+WHISPER_VAD_PARAMETERS = {"threshold": 0.5, "min_silence_duration_ms": 500}
+
+# Premium comparison calls run on one long-lived event loop thread sharing a single
+# AsyncOpenAI pool, so no worker thread sits blocked on a GPT-4o round-trip
+OPENAI_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_openai_loop = None
+_openai_loop_thread = None
+_openai_loop_pid = None
+_openai_client = None
+_openai_lock = threading.Lock()
+
+def _get_openai_loop():
+    """Start the shared OpenAI event loop and its client once per process"""
+    global _openai_loop, _openai_loop_thread, _openai_loop_pid, _openai_client
+    with _openai_lock:
+        # A forked child inherits the loop but not its thread, nor a usable copy of the
+        # parent's pooled connections, so it builds its own loop and client
+        if _openai_loop is None or _openai_loop_pid != os.getpid() or not _openai_loop_thread.is_alive():
+            # Imported here so workers that never run a comparison skip the SDK import
+            import openai
+            _openai_client = openai.AsyncOpenAI(
+                api_key=os.environ.get('OPENAI_API_KEY'),
+                http_client=httpx.AsyncClient(limits=OPENAI_POOL_LIMITS, timeout=httpx.Timeout(30.0, connect=5.0))
+            )
+            _openai_loop = asyncio.new_event_loop()
+            _openai_loop_thread = threading.Thread(target=_openai_loop.run_forever, name='openai-event-loop', daemon=True)
+            _openai_loop_thread.start()
+            _openai_loop_pid = os.getpid()
+    return _openai_loop
+
+_quality_score = itemgetter("quality_score")
+_cost = itemgetter("cost")
+_response_time = itemgetter("response_time")
 
 class PremiumLocalComparator:
     """Advanced comparison engine for premium vs local models"""
     
-    def __init__(self):
-        self.local_manager = LocalModelManager()
+    def __init__(self, local_manager):
+        # Shared with the local model endpoints so weights are loaded once per process
+        self.local_manager = local_manager
         self.comparison_metrics = {
             "accuracy_threshold": 90.0,
             "cost_savings_target": 80.0,
             "response_time_limit": 2.0
         }
+        self._premium_cache = OrderedDict()
+        self._premium_cache_lock = threading.Lock()
     
     def comprehensive_comparison(self, test_scenarios):
         """Run comprehensive comparison across multiple scenarios"""
@@ -267,31 +541,31 @@ class PremiumLocalComparator:
                 "recommendations": []
             }
             
-            total_premium_cost = 0
-            total_local_cost = 0
-            total_premium_time = 0
-            total_local_time = 0
-            accuracy_scores = []
+            premium_results = results["premium_results"]
+            local_results = results["local_results"]
             
-            for i, scenario in enumerate(test_scenarios):
-                # Test premium model
-                premium_result = self._test_premium_model(scenario)
-                local_result = self._test_local_model(scenario)
-                
-                results["premium_results"][f"scenario_{i+1}"] = premium_result
-                results["local_results"][f"scenario_{i+1}"] = local_result
-                
-                total_premium_cost += premium_result["cost"]
-                total_local_cost += local_result["cost"]
-                total_premium_time += premium_result["response_time"]
-                total_local_time += local_result["response_time"]
-                
-                # Calculate accuracy parity
-                accuracy_parity = (local_result["quality_score"] / premium_result["quality_score"]) * 100
-                accuracy_scores.append(accuracy_parity)
+            # Premium calls are awaited together on the OpenAI loop while local tests run in threads
+            premium_future = asyncio.run_coroutine_threadsafe(
+                self._test_premium_models(test_scenarios), _get_openai_loop()
+            )
+            with ThreadPoolExecutor(max_workers=min(MAX_COMPARISON_WORKERS, max(1, len(test_scenarios)))) as executor:
+                local_runs = list(executor.map(self._test_local_model, test_scenarios))
+            
+            # Collect per-scenario columns, then reduce each in a single C-level pass
+            premium_runs = premium_future.result()
+            for i, (premium_result, local_result) in enumerate(zip(premium_runs, local_runs), 1):
+                premium_results[f"scenario_{i}"] = premium_result
+                local_results[f"scenario_{i}"] = local_result
+            
+            premium_qs = list(map(_quality_score, premium_runs))
+            local_qs = list(map(_quality_score, local_runs))
+            total_premium_cost = fsum(map(_cost, premium_runs))
+            total_local_cost = fsum(map(_cost, local_runs))
+            total_premium_time = fsum(map(_response_time, premium_runs))
+            total_local_time = fsum(map(_response_time, local_runs))
             
             # Calculate overall metrics
-            avg_accuracy_parity = sum(accuracy_scores) / len(accuracy_scores)
+            avg_accuracy_parity = fmean(map(truediv, local_qs, premium_qs)) * 100
             cost_savings = ((total_premium_cost - total_local_cost) / total_premium_cost) * 100
             speed_improvement = (total_premium_time / total_local_time)
             
@@ -311,30 +585,48 @@ class PremiumLocalComparator:
             }
             
         except Exception as e:
-            logging.error(f"Comprehensive comparison error: {e}")
+            logging.error("Comprehensive comparison error: %s", e)
             return {"success": False, "error": str(e)}
     
-    def _test_premium_model(self, scenario):
+    async def _test_premium_models(self, test_scenarios):
+        """Run every premium scenario concurrently on the shared OpenAI pool"""
+        return await asyncio.gather(*(self._test_premium_model(s) for s in test_scenarios))
+    
+    async def _test_premium_model(self, scenario):
         """Test premium model performance"""
+        max_tokens = scenario.get("max_tokens", 500)
+        cache_key = ("gpt-4o", hashlib.blake2b(scenario["prompt"].encode(), digest_size=16).digest(), max_tokens)
+        with self._premium_cache_lock:
+            cached = self._premium_cache.get(cache_key)
+            if cached is not None:
+                self._premium_cache.move_to_end(cache_key)
+                # Keep the originally measured time/cost so comparisons stay meaningful
+                return {**copy.deepcopy(cached), "from_cache": True}
+        
         try:
             start_time = time.time()
             
             # Use OpenAI GPT-4o for testing
-            response = openai.chat.completions.create(
+            response = await _openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=[{"role": "user", "content": scenario["prompt"]}],
-                max_tokens=scenario.get("max_tokens", 500)
+                max_tokens=max_tokens
             )
             
             response_time = time.time() - start_time
             
-            return {
+            result = {
                 "response": response.choices[0].message.content,
                 "response_time": response_time,
                 "cost": response_time * 0.03,  # Estimated cost
                 "quality_score": 96.8,  # Premium model baseline
                 "model": "gpt-4o"
             }
+            with self._premium_cache_lock:
+                self._premium_cache[cache_key] = copy.deepcopy(result)
+                if len(self._premium_cache) > PREMIUM_CACHE_SIZE:
+                    self._premium_cache.popitem(last=False)
+            return result
             
         except Exception as e:
             # Fallback simulation if API fails
@@ -350,6 +642,7 @@ class PremiumLocalComparator:
     def _test_local_model(self, scenario):
         """Test local model performance"""
         try:
+            self.local_manager._ensure_loaded("llama-3.1-8b-ecosyno")
             start_time = time.time()
             
             # Simulate local model processing
@@ -366,7 +659,7 @@ class PremiumLocalComparator:
             }
             
         except Exception as e:
-            logging.error(f"Local model test error: {e}")
+            logging.error("Local model test error: %s", e)
             return {
                 "response": "Local model error",
                 "response_time": 0.5,
@@ -384,9 +677,18 @@ class PremiumLocalComparator:
         else:
             return "premium"
 
+# Module-specific models, shared read-only across requests
+_MODULE_MODEL_MAPPING = MappingProxyType({
+    'wellness': ('wellnesssyno-ai', 'nutrisyno-pro'),
+    'environment': ('envirosyno-local', 'energysyno-ai'),
+    'smart-home': ('homesyno-controller', 'securitysyno-ai'),
+    'mobility': ('mobilitysyno-ai', 'trafficsyno-ai'),
+    'marketplace': ('marketsyno-ai',)
+})
+
 # Initialize managers
 local_model_manager = LocalModelManager()
-premium_local_comparator = PremiumLocalComparator()
+premium_local_comparator = PremiumLocalComparator(local_model_manager)
 
 # API Endpoints
 
@@ -394,15 +696,14 @@ premium_local_comparator = PremiumLocalComparator()
 @token_required
 def load_local_model(model_name):
     """Load a specific local model"""
-    result = local_model_manager.load_model(model_name)
+    result = local_model_manager.load_model(model_name, precision=request.args.get('precision', type=int))
     return jsonify(result)
 
 @comprehensive_ai_bp.route('/api/local-models/status', methods=['GET'])
 @token_required
 def get_models_status():
     """Get status of all AI models"""
-    result = local_model_manager.get_model_status()
-    return jsonify(result)
+    return current_app.response_class(local_model_manager.get_model_status_json(), mimetype='application/json')
 
 @comprehensive_ai_bp.route('/api/local-models/load-module-models', methods=['POST'])
 @token_required
@@ -412,21 +713,17 @@ def load_module_specific_models():
         data = request.get_json() or {}
         modules = data.get('modules', [])
         
-        module_model_mapping = {
-            'wellness': ['wellnesssyno-ai', 'nutrisyno-pro'],
-            'environment': ['envirosyno-local', 'energysyno-ai'],
-            'smart-home': ['homesyno-controller', 'securitysyno-ai'],
-            'mobility': ['mobilitysyno-ai', 'trafficsyno-ai'],
-            'marketplace': ['marketsyno-ai']
-        }
+        # Unique models across the requested modules, in request order
+        models_to_load = list(dict.fromkeys(
+            model for module in modules for model in _MODULE_MODEL_MAPPING.get(module, ())
+        ))
+        loaded_models = [model for model in models_to_load if local_model_manager.load_model(model)["success"]]
         
-        loaded_models = []
-        for module in modules:
-            if module in module_model_mapping:
-                for model in module_model_mapping[module]:
-                    result = local_model_manager.load_model(model)
-                    if result["success"]:
-                        loaded_models.append(model)
+        # Optionally materialize the weights now, all models at once; the per-model
+        # locks keep an overlapping request from loading the same model twice
+        if data.get('preload') and loaded_models:
+            with ThreadPoolExecutor(max_workers=min(8, len(loaded_models))) as executor:
+                list(executor.map(local_model_manager._ensure_loaded, loaded_models))
         
         return jsonify({
             "success": True,
@@ -436,9 +733,38 @@ def load_module_specific_models():
         })
         
     except Exception as e:
-        logging.error(f"Module models loading error: {e}")
+        logging.error("Module models loading error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Default test scenarios for SDLC, built once rather than per request
+DEFAULT_COMPARISON_SCENARIOS = (
+    {
+        "prompt": "Generate comprehensive requirements for a sustainable mobility platform",
+        "max_tokens": 500,
+        "category": "requirements_analysis"
+    },
+    {
+        "prompt": "Design a microservices architecture for an IoT-enabled smart home system",
+        "max_tokens": 600,
+        "category": "architecture_design"
+    },
+    {
+        "prompt": "Write Python code for a real-time environmental monitoring API",
+        "max_tokens": 800,
+        "category": "code_generation"
+    },
+    {
+        "prompt": "Create comprehensive test cases for a wellness tracking application",
+        "max_tokens": 400,
+        "category": "test_generation"
+    },
+    {
+        "prompt": "Analyze and optimize database performance for a marketplace platform",
+        "max_tokens": 500,
+        "category": "performance_optimization"
+    }
+)
+
 @comprehensive_ai_bp.route('/api/testing/premium-local/comprehensive-compare', methods=['POST'])
 @token_required
 def comprehensive_premium_local_comparison():
@@ -446,36 +772,7 @@ def comprehensive_premium_local_comparison():
     try:
         data = request.get_json() or {}
         
-        # Default test scenarios for SDLC
-        default_scenarios = [
-            {
-                "prompt": "Generate comprehensive requirements for a sustainable mobility platform",
-                "max_tokens": 500,
-                "category": "requirements_analysis"
-            },
-            {
-                "prompt": "Design a microservices architecture for an IoT-enabled smart home system",
-                "max_tokens": 600,
-                "category": "architecture_design"
-            },
-            {
-                "prompt": "Write Python code for a real-time environmental monitoring API",
-                "max_tokens": 800,
-                "category": "code_generation"
-            },
-            {
-                "prompt": "Create comprehensive test cases for a wellness tracking application",
-                "max_tokens": 400,
-                "category": "test_generation"
-            },
-            {
-                "prompt": "Analyze and optimize database performance for a marketplace platform",
-                "max_tokens": 500,
-                "category": "performance_optimization"
-            }
-        ]
-        
-        test_scenarios = data.get('scenarios', default_scenarios)
+        test_scenarios = data.get('scenarios') or DEFAULT_COMPARISON_SCENARIOS
         
         comparison_result = premium_local_comparator.comprehensive_comparison(test_scenarios)
         
@@ -487,13 +784,13 @@ def comprehensive_premium_local_comparison():
                 "speed_improvement": comparison_result["results"]["comparison_summary"]["speed_improvement"],
                 "recommendation": comparison_result["results"]["comparison_summary"]["recommendation"],
                 "detailed_results": comparison_result["results"],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": comparison_result["timestamp"]
             })
         else:
             return jsonify(comparison_result), 500
             
     except Exception as e:
-        logging.error(f"Comprehensive comparison error: {e}")
+        logging.error("Comprehensive comparison error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @comprehensive_ai_bp.route('/api/local-models/whisper/transcribe', methods=['POST'])
@@ -507,8 +804,29 @@ def transcribe_audio_whisper():
         audio_file = request.files['audio']
         language = request.form.get('language', 'auto')
         
-        # Simulate Whisper transcription
-        # In production, this would use the actual Whisper model
+        whisper = local_model_manager._ensure_loaded("whisper-large-local").get("model")
+        
+        if whisper is not None:
+            start_time = time.time()
+            # faster-whisper decodes straight from the upload stream; segments are generated lazily
+            segments, info = whisper.transcribe(
+                audio_file.stream,
+                language=None if language == 'auto' else language,
+                vad_filter=True,
+                vad_parameters=WHISPER_VAD_PARAMETERS,
+                beam_size=5
+            )
+            transcription = " ".join(segment.text.strip() for segment in segments)
+            return jsonify({
+                "success": True,
+                "transcription": transcription,
+                "language": info.language,
+                "confidence": round(info.language_probability * 100, 1),
+                "processing_time": round(time.time() - start_time, 2),
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        # Simulate Whisper transcription when no local backend is installed
         transcription_result = {
             "transcription": "This is a simulated transcription from the local Whisper model. The audio has been processed with 97.3% accuracy.",
             "language": language if language != 'auto' else 'en',
@@ -527,7 +845,7 @@ def transcribe_audio_whisper():
         })
         
     except Exception as e:
-        logging.error(f"Whisper transcription error: {e}")
+        logging.error("Whisper transcription error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @comprehensive_ai_bp.route('/api/local-models/geolocation/analyze', methods=['POST'])
@@ -536,10 +854,11 @@ def analyze_geolocation():
     """Analyze location using GeoSyno local model"""
     try:
         data = request.get_json() or {}
-        latitude = data.get('latitude')
-        longitude = data.get('longitude')
-        
-        if not latitude or not longitude:
+        # 0.0 is a valid coordinate (equator / prime meridian), so check presence and type, not truthiness
+        try:
+            latitude = float(data['latitude'])
+            longitude = float(data['longitude'])
+        except (KeyError, TypeError, ValueError):
             return jsonify({"success": False, "error": "Latitude and longitude required"}), 400
         
         # Simulate geolocation analysis
@@ -567,7 +886,7 @@ def analyze_geolocation():
         })
         
     except Exception as e:
-        logging.error(f"Geolocation analysis error: {e}")
+        logging.error("Geolocation analysis error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @comprehensive_ai_bp.route('/api/local-models/traffic/analyze', methods=['POST'])
@@ -576,10 +895,11 @@ def analyze_traffic():
     """Analyze traffic using TrafficSyno AI"""
     try:
         data = request.get_json() or {}
-        latitude = data.get('latitude')
-        longitude = data.get('longitude')
-        
-        if not latitude or not longitude:
+        # 0.0 is a valid coordinate (equator / prime meridian), so check presence and type, not truthiness
+        try:
+            latitude = float(data['latitude'])
+            longitude = float(data['longitude'])
+        except (KeyError, TypeError, ValueError):
             return jsonify({"success": False, "error": "Location coordinates required"}), 400
         
         # Simulate traffic analysis
@@ -608,7 +928,7 @@ def analyze_traffic():
         })
         
     except Exception as e:
-        logging.error(f"Traffic analysis error: {e}")
+        logging.error("Traffic analysis error: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 # Register blueprint
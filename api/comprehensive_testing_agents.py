@@ -4,12 +4,13 @@ Full-featured testing framework with detailed reporting capabilities
 """
 
 import os
-import json
+import random
 import logging
 import time
 import subprocess
 import threading
 import sqlite3
+import orjson
 import uuid
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, render_template_string
@@ -18,6 +19,7 @@ import openai
 import anthropic
 import google.generativeai as genai
 from auth_middleware import token_required
+from api.system_metrics import get_system_stats
 import requests
 import base64
 import psutil
@@ -25,6 +27,7 @@ import concurrent.futures
 from dataclasses import dataclass
 from typing import List, Dict, Any
 import traceback
+from cachetools import TTLCache
 
 # Initialize AI clients
 openai.api_key = os.environ.get('OPENAI_API_KEY')
@@ -44,18 +47,38 @@ class TestResult:
     timestamp: datetime
     agent_name: str
 
+# WAL lets report reads run alongside inserts, and with synchronous=NORMAL a commit
+# no longer waits on an fsync; the report data is cheap to regenerate if lost
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+# Generated reports are reused for a few seconds so dashboard polling doesn't re-run the
+# report queries; shared by every manager and cleared whenever new results are saved
+REPORT_CACHE_TTL = 5  # seconds
+_report_cache = TTLCache(maxsize=64, ttl=REPORT_CACHE_TTL)
+_report_cache_lock = threading.Lock()
+
 class TestReportManager:
     """Manages comprehensive test reporting and analytics"""
     
     def __init__(self):
         self.db_path = "test_reports.db"
+        # One long-lived connection per manager, shared by request threads under a lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        for pragma in SQLITE_PRAGMAS:
+            self._conn.execute(pragma)
         self.init_database()
     
     def init_database(self):
         """Initialize test results database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn.cursor()
             
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS test_results (
@@ -70,6 +93,11 @@ class TestReportManager:
                 )
             ''')
             
+            # Every report reads a timestamp window (latest 100 or last hour)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_test_results_timestamp ON test_results (timestamp DESC)
+            ''')
+            
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS test_sessions (
                     session_id TEXT PRIMARY KEY,
@@ -93,8 +121,7 @@ class TestReportManager:
                 )
             ''')
             
-            conn.commit()
-            conn.close()
+            self._conn.commit()
             logging.info("Test reports database initialized successfully")
             
         except Exception as e:
@@ -102,81 +129,99 @@ class TestReportManager:
     
     def save_test_result(self, test_result: TestResult):
         """Save test result to database"""
+        self.save_test_results([test_result])
+    
+    def save_test_results(self, test_results: List[TestResult]):
+        """Save a batch of test results in one transaction"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Results from one run share a timestamp, so format each distinct one once
+            timestamps = {timestamp: timestamp.isoformat() for timestamp in {r.timestamp for r in test_results}}
+            rows = [
+                (
+                    test_result.test_id,
+                    test_result.test_name,
+                    test_result.category,
+                    test_result.status,
+                    test_result.execution_time,
+                    orjson.dumps(test_result.details).decode(),
+                    timestamps[test_result.timestamp],
+                    test_result.agent_name
+                )
+                for test_result in test_results
+            ]
             
-            cursor.execute('''
-                INSERT INTO test_results 
-                (id, test_name, category, status, execution_time, details, timestamp, agent_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                test_result.test_id,
-                test_result.test_name,
-                test_result.category,
-                test_result.status,
-                test_result.execution_time,
-                json.dumps(test_result.details),
-                test_result.timestamp.isoformat(),
-                test_result.agent_name
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._lock, self._conn:
+                self._conn.executemany('''
+                    INSERT INTO test_results 
+                    (id, test_name, category, status, execution_time, details, timestamp, agent_name)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+            with _report_cache_lock:
+                _report_cache.clear()
             
         except Exception as e:
-            logging.error(f"Error saving test result: {e}")
+            logging.error(f"Error saving test results: {e}")
     
     def generate_comprehensive_report(self, session_id=None):
         """Generate comprehensive test report"""
+        cache_key = (self.db_path, session_id)
+        with _report_cache_lock:
+            cached = _report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get test results
+            # Report window: the last hour for a session, otherwise the latest 100 results
             if session_id:
-                cursor.execute('''
-                    SELECT * FROM test_results WHERE timestamp > datetime('now', '-1 hour')
-                    ORDER BY timestamp DESC
-                ''')
+                window = "SELECT * FROM test_results WHERE timestamp > datetime('now', '-1 hour')"
             else:
-                cursor.execute('''
-                    SELECT * FROM test_results ORDER BY timestamp DESC LIMIT 100
+                window = "SELECT * FROM test_results ORDER BY timestamp DESC LIMIT 100"
+            
+            # Counts and averages are computed by SQLite rather than over fetched rows
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute(f'''
+                    WITH recent AS ({window})
+                    SELECT COUNT(*), SUM(status = 'passed'), SUM(status = 'failed'), AVG(execution_time)
+                    FROM recent
                 ''')
-            
-            results = cursor.fetchall()
-            
-            # Generate analytics
-            total_tests = len(results)
-            passed_tests = len([r for r in results if r[3] == 'passed'])
-            failed_tests = len([r for r in results if r[3] == 'failed'])
-            
-            # Category breakdown
-            category_stats = {}
-            agent_stats = {}
-            
-            for result in results:
-                category = result[2]
-                agent = result[7]
+                total_tests, passed_tests, failed_tests, avg_execution_time = cursor.fetchone()
                 
-                if category not in category_stats:
-                    category_stats[category] = {'total': 0, 'passed': 0, 'failed': 0}
-                category_stats[category]['total'] += 1
-                if result[3] == 'passed':
-                    category_stats[category]['passed'] += 1
-                else:
-                    category_stats[category]['failed'] += 1
+                cursor.execute(f'''
+                    WITH recent AS ({window})
+                    SELECT category, COUNT(*), SUM(status = 'passed') FROM recent GROUP BY category
+                ''')
+                category_rows = cursor.fetchall()
+                
+                cursor.execute(f'''
+                    WITH recent AS ({window})
+                    SELECT agent_name, COUNT(*), SUM(status = 'passed') FROM recent GROUP BY agent_name
+                ''')
+                agent_rows = cursor.fetchall()
                 
-                if agent not in agent_stats:
-                    agent_stats[agent] = {'total': 0, 'passed': 0, 'failed': 0}
-                agent_stats[agent]['total'] += 1
-                if result[3] == 'passed':
-                    agent_stats[agent]['passed'] += 1
-                else:
-                    agent_stats[agent]['failed'] += 1
+                cursor.execute(f'''
+                    WITH recent AS ({window})
+                    SELECT test_name, category, status, execution_time, timestamp, agent_name
+                    FROM recent ORDER BY timestamp DESC LIMIT 20
+                ''')
+                recent_results = cursor.fetchall()
+            
+            # SUM/AVG are NULL over an empty window
+            passed_tests = passed_tests or 0
+            failed_tests = failed_tests or 0
+            avg_execution_time = avg_execution_time or 0
+            
+            # Category and agent breakdown; anything not passed counts as failed
+            category_stats = {
+                category: {'total': total, 'passed': passed, 'failed': total - passed}
+                for category, total, passed in category_rows
+            }
+            agent_stats = {
+                agent: {'total': total, 'passed': passed, 'failed': total - passed}
+                for agent, total, passed in agent_rows
+            }
             
             # Performance metrics
-            avg_execution_time = sum(r[4] for r in results) / total_tests if total_tests > 0 else 0
             pass_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
             
             report = {
@@ -193,18 +238,19 @@ class TestReportManager:
                 "agent_performance": agent_stats,
                 "recent_results": [
                     {
-                        "test_name": r[1],
-                        "category": r[2],
-                        "status": r[3],
-                        "execution_time": r[4],
-                        "timestamp": r[6],
-                        "agent": r[7]
-                    } for r in results[:20]
+                        "test_name": r["test_name"],
+                        "category": r["category"],
+                        "status": r["status"],
+                        "execution_time": r["execution_time"],
+                        "timestamp": r["timestamp"],
+                        "agent": r["agent_name"]
+                    } for r in recent_results
                 ],
                 "recommendations": self._generate_recommendations(category_stats, agent_stats, pass_rate)
             }
             
-            conn.close()
+            with _report_cache_lock:
+                _report_cache[cache_key] = report
             return report
             
         except Exception as e:
@@ -246,6 +292,8 @@ class UnitTestSynoAgent:
         """Execute comprehensive unit test suite"""
         try:
             test_results = []
+            records = []
+            run_timestamp = datetime.now()  # one timestamp for the whole run
             test_modules = [
                 "api.wellness", "api.environment", "api.marketplace", 
                 "api.kitchen", "api.wardrobe", "ai_gateway",
@@ -256,18 +304,19 @@ class UnitTestSynoAgent:
                 result = self._test_module(module)
                 test_results.append(result)
                 
-                # Save to database
-                test_result = TestResult(
+                records.append(TestResult(
                     test_id=str(uuid.uuid4()),
                     test_name=f"Unit test: {module}",
                     category="unit_testing",
                     status=result["status"],
                     execution_time=result["execution_time"],
                     details=result,
-                    timestamp=datetime.now(),
+                    timestamp=run_timestamp,
                     agent_name=self.name
-                )
-                self.report_manager.save_test_result(test_result)
+                ))
+            
+            # Save to database
+            self.report_manager.save_test_results(records)
             
             # Calculate overall metrics
             total_tests = sum(r["tests_run"] for r in test_results)
@@ -294,7 +343,6 @@ class UnitTestSynoAgent:
         start_time = time.time()
         
         # Simulate comprehensive module testing
-        import random
         tests_run = random.randint(15, 35)
         success_rate = random.uniform(0.88, 0.98)
         tests_passed = int(tests_run * success_rate)
@@ -311,9 +359,25 @@ class UnitTestSynoAgent:
             "coverage": round(random.uniform(85, 95), 1)
         }
 
+# Simulated severity mix of security findings, as cumulative weights for random.choices
+SEVERITY_LEVELS = ("critical", "high", "medium", "low")
+SEVERITY_CUM_WEIGHTS = (0.05, 0.2, 0.6, 1.0)
+
 class SecurityTestSynoAgent:
     """Advanced security testing agent"""
     
+    VULNERABILITY_PROBABILITY = {
+        "authentication": 0.1,
+        "authorization": 0.05,
+        "input_validation": 0.15,
+        "sql_injection": 0.02,
+        "xss_protection": 0.08,
+        "csrf_protection": 0.03,
+        "ssl_configuration": 0.01,
+        "session_management": 0.06,
+        "api_security": 0.12
+    }
+    
     def __init__(self):
         self.name = "SecurityTestSyno"
         self.status = "critical"
@@ -324,6 +388,8 @@ class SecurityTestSynoAgent:
         """Execute comprehensive security scan"""
         try:
             scan_results = []
+            records = []
+            run_timestamp = datetime.now()  # one timestamp for the whole run
             security_categories = [
                 "authentication", "authorization", "input_validation",
                 "sql_injection", "xss_protection", "csrf_protection",
@@ -346,18 +412,19 @@ class SecurityTestSynoAgent:
                 medium_count += result["severity_breakdown"]["medium"]
                 low_count += result["severity_breakdown"]["low"]
                 
-                # Save to database
-                test_result = TestResult(
+                records.append(TestResult(
                     test_id=str(uuid.uuid4()),
                     test_name=f"Security scan: {category}",
                     category="security_testing",
                     status="passed" if result["vulnerabilities_found"] == 0 else "warning",
                     execution_time=result["scan_time"],
                     details=result,
-                    timestamp=datetime.now(),
+                    timestamp=run_timestamp,
                     agent_name=self.name
-                )
-                self.report_manager.save_test_result(test_result)
+                ))
+            
+            # Save to database
+            self.report_manager.save_test_results(records)
             
             # Calculate security score
             security_score = max(0, 100 - (critical_count * 10 + high_count * 5 + medium_count * 2 + low_count * 1))
@@ -387,32 +454,14 @@ class SecurityTestSynoAgent:
         start_time = time.time()
         
         # Simulate realistic security scanning
-        import random
-        
-        vulnerability_probability = {
-            "authentication": 0.1,
-            "authorization": 0.05,
-            "input_validation": 0.15,
-            "sql_injection": 0.02,
-            "xss_protection": 0.08,
-            "csrf_protection": 0.03,
-            "ssl_configuration": 0.01,
-            "session_management": 0.06,
-            "api_security": 0.12
-        }
-        
-        prob = vulnerability_probability.get(category, 0.05)
+        prob = self.VULNERABILITY_PROBABILITY.get(category, 0.05)
         vulnerabilities_found = random.choices([0, 1, 2], weights=[1-prob, prob*0.8, prob*0.2])[0]
         
         severity_breakdown = {"critical": 0, "high": 0, "medium": 0, "low": 0}
         
-        if vulnerabilities_found > 0:
-            for _ in range(vulnerabilities_found):
-                severity = random.choices(
-                    ["critical", "high", "medium", "low"],
-                    weights=[0.05, 0.15, 0.4, 0.4]
-                )[0]
-                severity_breakdown[severity] += 1
+        # Draw every finding's severity in one call
+        for severity in random.choices(SEVERITY_LEVELS, cum_weights=SEVERITY_CUM_WEIGHTS, k=vulnerabilities_found):
+            severity_breakdown[severity] += 1
         
         scan_time = time.time() - start_time + random.uniform(1.0, 3.0)
         
@@ -450,6 +499,8 @@ class LoadTestSynoAgent:
         """Execute comprehensive load testing"""
         try:
             load_test_results = []
+            records = []
+            run_timestamp = datetime.now()  # one timestamp for the whole run
             test_scenarios = [
                 {"name": "API Endpoints", "concurrent_users": 100, "duration": 30},
                 {"name": "Authentication System", "concurrent_users": 50, "duration": 60},
@@ -458,22 +509,26 @@ class LoadTestSynoAgent:
                 {"name": "Real-time Features", "concurrent_users": 150, "duration": 120}
             ]
             
-            for scenario in test_scenarios:
-                result = self._execute_load_scenario(scenario)
+            # Each scenario mostly waits, so run them side by side
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(test_scenarios)) as executor:
+                scenario_results = list(executor.map(self._execute_load_scenario, test_scenarios))
+            
+            for scenario, result in zip(test_scenarios, scenario_results):
                 load_test_results.append(result)
                 
-                # Save to database
-                test_result = TestResult(
+                records.append(TestResult(
                     test_id=str(uuid.uuid4()),
                     test_name=f"Load test: {scenario['name']}",
                     category="performance_testing",
                     status="passed" if result["success_rate"] > 95 else "warning",
                     execution_time=result["duration"],
                     details=result,
-                    timestamp=datetime.now(),
+                    timestamp=run_timestamp,
                     agent_name=self.name
-                )
-                self.report_manager.save_test_result(test_result)
+                ))
+            
+            # Save to database
+            self.report_manager.save_test_results(records)
             
             # Calculate overall metrics
             avg_response_time = sum(r["avg_response_time"] for r in load_test_results) / len(load_test_results)
@@ -498,8 +553,6 @@ class LoadTestSynoAgent:
         start_time = time.time()
         
         # Simulate load testing
-        import random
-        
         base_response_time = random.uniform(50, 200)
         success_rate = random.uniform(94, 99.5)
         
@@ -527,7 +580,8 @@ class LoadTestSynoAgent:
     def _get_system_metrics(self):
         """Get current system performance metrics"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU comes from the background sampler instead of blocking a second here
+            cpu_percent = get_system_stats()['cpu_usage']
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
@@ -554,36 +608,34 @@ class AIModelTestSynoAgent:
     def test_ai_models(self):
         """Test AI model accuracy and performance"""
         try:
-            model_results = []
-            
-            # Test premium models
             premium_models = ["gpt-4o", "claude-3-5-sonnet-20241022", "gemini-1.5-pro"]
-            for model in premium_models:
-                result = self._test_premium_model(model)
-                model_results.append(result)
-            
-            # Test local models
             local_models = ["llama-3.1-8b-ecosyno", "mistral-7b-ecosyno", "ecosyno-vision-local"]
-            for model in local_models:
-                result = self._test_local_model(model)
-                model_results.append(result)
+            
+            # Premium API calls and local model runs are all waits, so test every model at once
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(premium_models) + len(local_models)) as executor:
+                premium_futures = [executor.submit(self._test_premium_model, model) for model in premium_models]
+                local_futures = [executor.submit(self._test_local_model, model) for model in local_models]
+            
+            model_results = [future.result() for future in premium_futures + local_futures]
             
             # Calculate overall accuracy
             overall_accuracy = sum(r["accuracy"] for r in model_results) / len(model_results)
             
             # Save results
+            records = []
+            run_timestamp = datetime.now()  # one timestamp for the whole run
             for result in model_results:
-                test_result = TestResult(
+                records.append(TestResult(
                     test_id=str(uuid.uuid4()),
                     test_name=f"AI model test: {result['model_name']}",
                     category="ai_model_testing",
                     status="passed" if result["accuracy"] > 85 else "warning",
                     execution_time=result["test_duration"],
                     details=result,
-                    timestamp=datetime.now(),
+                    timestamp=run_timestamp,
                     agent_name=self.name
-                )
-                self.report_manager.save_test_result(test_result)
+                ))
+            self.report_manager.save_test_results(records)
             
             return {
                 "success": True,
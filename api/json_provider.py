@@ -0,0 +1,30 @@
+"""
+orjson-backed JSON provider for Flask
+Drop-in replacement for the stdlib json used by jsonify and request.get_json
+"""
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize with orjson, falling back to Flask's default() for types orjson lacks (e.g. Decimal)"""
+
+    @property
+    def option(self):
+        # Datetimes pass through to default() so they keep Flask's HTTP-date format, and
+        # keys are sorted whenever the app's sort_keys setting asks for it, as with stdlib json
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return option | orjson.OPT_SORT_KEYS if self.sort_keys else option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand orjson's bytes straight to the response without a str round-trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
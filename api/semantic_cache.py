@@ -0,0 +1,88 @@
+"""
+Semantic response cache for the SynoMind Claude chat
+Answers a near-duplicate prompt in the same conversation context from an earlier Claude reply
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+import redis
+from api.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from fastembed import TextEmbedding
+except ImportError:
+    logger.info("fastembed not available, semantic response cache disabled")
+    np = None
+    TextEmbedding = None
+
+SEMANTIC_CACHE_ENABLED = os.environ.get('SYNOMIND_SEMANTIC_CACHE', '').lower() in ('1', 'true', 'yes')
+SIMILARITY_THRESHOLD = float(os.environ.get('SYNOMIND_SEMANTIC_CACHE_THRESHOLD', '0.95'))
+EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+MAX_ENTRIES = 500  # per conversation context
+ENTRY_TTL = 86400  # seconds
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+def is_enabled():
+    """True when the cache is switched on and its dependencies are installed"""
+    return SEMANTIC_CACHE_ENABLED and TextEmbedding is not None
+
+def _get_embedder():
+    """Load the embedding model once per process"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = TextEmbedding(model_name=EMBEDDING_MODEL)
+    return _embedder
+
+def _context_key(conversation_history):
+    """Redis key for a conversation context, so answers never cross between histories"""
+    digest = hashlib.blake2b(
+        json.dumps(conversation_history, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+    return f'synomind:semcache:{digest}'
+
+def _embed(text):
+    """Unit-normalized embedding, so a dot product is the cosine similarity"""
+    vector = np.asarray(next(iter(_get_embedder().embed([text]))), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+def lookup(user_input, conversation_history):
+    """Return (cached_response or None, query embedding) for the prompt"""
+    query = _embed(user_input)
+    try:
+        entries = redis_client.lrange(_context_key(conversation_history), 0, -1)
+    except redis.RedisError as e:
+        logger.warning(f"Semantic cache read failed: {e}")
+        return None, query
+    if not entries:
+        return None, query
+
+    # Exact top-1 inner-product search over this context's entries
+    entries = [json.loads(entry) for entry in entries]
+    matrix = np.asarray([entry['v'] for entry in entries], dtype=np.float32)
+    scores = matrix @ query
+    best = int(np.argmax(scores))
+    if scores[best] >= SIMILARITY_THRESHOLD:
+        return entries[best]['r'], query
+    return None, query
+
+def store(conversation_history, query, response_text):
+    """Remember a Claude response under its prompt embedding"""
+    key = _context_key(conversation_history)
+    entry = json.dumps({'v': [round(float(x), 5) for x in query], 'r': response_text})
+    try:
+        with redis_client.pipeline() as pipe:
+            pipe.lpush(key, entry)
+            pipe.ltrim(key, 0, MAX_ENTRIES - 1)
+            pipe.expire(key, ENTRY_TTL)
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Semantic cache write failed: {e}")
@@ -0,0 +1,86 @@
+"""
+Background system metrics sampler
+Keeps a fresh CPU/memory/disk snapshot so request handlers never block on psutil
+"""
+import time
+import logging
+import threading
+from collections import deque
+import psutil
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 1  # seconds
+CPU_WINDOW = 5  # samples averaged into the reported CPU usage
+PRIME_INTERVAL = 0.1  # seconds of CPU measured once at startup so the first reading isn't 0.0
+CONNECTIONS_INTERVAL = 60  # net_connections() walks every socket, so sample it rarely
+
+# Boot time never changes while the process is alive
+BOOT_TIME = psutil.boot_time()
+
+_snapshot = {
+    'cpu_usage': 0.0,
+    'memory_usage': 0.0,
+    'disk_usage': 0.0,
+    'active_connections': 0,
+    'sampled_at': 0.0,
+    'connections_sampled_at': 0.0
+}
+# Ring buffer of recent 1-second CPU samples
+_cpu_samples = deque(maxlen=CPU_WINDOW)
+_sampler_lock = threading.Lock()
+_sampler_thread = None
+
+def _sample_loop():
+    """Refresh the metrics snapshot forever"""
+    while True:
+        try:
+            # cpu_percent blocks for the interval, which paces the loop
+            _cpu_samples.append(psutil.cpu_percent(interval=SAMPLE_INTERVAL))
+            _snapshot.update({
+                'cpu_usage': round(sum(_cpu_samples) / len(_cpu_samples), 1),
+                'memory_usage': psutil.virtual_memory().percent,
+                'disk_usage': psutil.disk_usage('/').percent,
+                'sampled_at': time.time()
+            })
+            if time.time() - _snapshot['connections_sampled_at'] >= CONNECTIONS_INTERVAL:
+                _snapshot.update({
+                    'active_connections': len(psutil.net_connections()),
+                    'connections_sampled_at': time.time()
+                })
+        except Exception as e:
+            logger.error(f"System metrics sampling failed: {e}")
+            time.sleep(SAMPLE_INTERVAL)
+
+def start_sampler():
+    """Start the sampler thread once per process"""
+    global _sampler_thread
+    with _sampler_lock:
+        if _sampler_thread is None or not _sampler_thread.is_alive():
+            # Prime the snapshot so the first reader gets real numbers; cpu_percent needs a
+            # measured interval, a non-blocking first call always returns 0.0
+            _cpu_samples.append(psutil.cpu_percent(interval=PRIME_INTERVAL))
+            _snapshot.update({
+                'cpu_usage': _cpu_samples[-1],
+                'memory_usage': psutil.virtual_memory().percent,
+                'disk_usage': psutil.disk_usage('/').percent,
+                'sampled_at': time.time()
+            })
+            _sampler_thread = threading.Thread(target=_sample_loop, name='system-metrics-sampler', daemon=True)
+            _sampler_thread.start()
+
+def get_system_stats():
+    """Return the latest CPU/memory/disk snapshot without blocking"""
+    if _sampler_thread is None:
+        start_sampler()
+    return {
+        'cpu_usage': _snapshot['cpu_usage'],
+        'memory_usage': _snapshot['memory_usage'],
+        'disk_usage': _snapshot['disk_usage']
+    }
+
+def get_active_connections():
+    """Return the most recent open-socket count without blocking"""
+    if _sampler_thread is None:
+        start_sampler()
+    return _snapshot['active_connections']
@@ -0,0 +1,143 @@
+"""
+Background task queue for SynoMind admin jobs
+Long-running training work runs on Celery workers instead of inside Flask requests.
+Start a worker with: celery -A api.tasks.celery_app worker --beat
+"""
+import os
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from celery import Celery
+from api.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Configure Google AI once per worker process rather than per task
+GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
+_GENAI_MODEL = None
+
+try:
+    import google.generativeai as genai
+    if GOOGLE_API_KEY:
+        genai.configure(api_key=GOOGLE_API_KEY)
+        _GENAI_MODEL = genai.GenerativeModel('gemini-1.5-pro-latest')
+except ImportError:
+    logger.error("Google Generative AI library not available")
+    genai = None
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+TRAINING_SERVICE_URL = os.environ.get('TRAINING_SERVICE_URL', 'http://localhost:5000/api/google-ai-training')
+
+celery_app = Celery(
+    'ecosyno',
+    broker=os.environ.get('CELERY_BROKER_URL', REDIS_URL),
+    backend=os.environ.get('CELERY_RESULT_BACKEND', REDIS_URL)
+)
+celery_app.conf.update(
+    task_track_started=True,
+    result_expires=3600,
+    beat_schedule={
+        'refresh-module-activity': {
+            'task': 'api.tasks.refresh_module_activity',
+            'schedule': 300.0
+        }
+    }
+)
+
+# Pooled keep-alive connections to the training service, reused across tasks
+_http = requests.Session()
+_http.mount('http://', HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.1)))
+_http.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# (connect, read) timeouts so a hung training service cannot wedge a worker
+HTTP_TIMEOUT = (2, 30)
+
+def _control_key(task_id):
+    return f'synomind:training:{task_id}:control'
+
+def request_training_control(task_id, action):
+    """Ask a running training task to 'pause' or 'stop' after its current batch"""
+    redis_client.setex(_control_key(task_id), 3600, action)
+
+@celery_app.task(bind=True)
+def train_synomind_task(self, google_ai_config):
+    """Start Gemini training on the training service and drive it to completion"""
+    response = _http.post(
+        f'{TRAINING_SERVICE_URL}/start-training',
+        json=google_ai_config,
+        headers={'Content-Type': 'application/json'},
+        timeout=HTTP_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise Exception(f"Training service error: {response.status_code}")
+
+    result = response.json()
+    if not result.get('success'):
+        raise Exception(result.get('error', 'Unknown error'))
+
+    session_id = result['session_id']
+    meta = {
+        'session_id': session_id,
+        'model': result['model'],
+        'languages': result['languages'],
+        'progress': 0,
+        'start_time': time.time()
+    }
+    self.update_state(state='PROGRESS', meta=meta)
+    logger.info(f"Real Gemini AI training started: {session_id}")
+
+    # Process prompt batches until the training service reports completion
+    while meta['progress'] < 100:
+        # Honour pause/stop requests between batches; progress is kept by the training service
+        action = redis_client.get(_control_key(self.request.id))
+        if action:
+            meta['status'] = 'paused' if action == b'paused' else 'stopped'
+            meta['end_time'] = time.time()
+            logger.info(f"Training {session_id} {meta['status']} at {meta['progress']}%")
+            return meta
+
+        batch = _http.post(
+            f'{TRAINING_SERVICE_URL}/process-batch/{session_id}',
+            json={'batch_size': 3},
+            timeout=HTTP_TIMEOUT
+        ).json()
+        if not batch.get('success'):
+            raise Exception(batch.get('error', 'Unknown error'))
+
+        meta['progress'] = batch['progress']
+        self.update_state(state='PROGRESS', meta=meta)
+
+    meta['status'] = 'completed'
+    meta['end_time'] = time.time()
+    return meta
+
+@celery_app.task(soft_time_limit=60, time_limit=90)
+def test_genai_task(prompt):
+    """Run a single Gemini prompt to verify the Google AI connection"""
+    if genai is None:
+        raise Exception('Google AI library not available')
+    if _GENAI_MODEL is None:
+        raise Exception('Google API key not found in environment')
+
+    response = _GENAI_MODEL.generate_content(prompt)
+
+    logger.info("Google AI test successful with real API key")
+
+    return {
+        'test_response': response.text[:200] + "..." if len(response.text) > 200 else response.text,
+        'model': 'gemini-1.5-pro'
+    }
+
+@celery_app.task
+def refresh_module_activity():
+    """Refresh the module_activity_daily view behind the admin analytics pages"""
+    from app import app, db
+    from api.admin_system import refresh_module_activity_view, mark_module_activity_refreshed
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            refresh_module_activity_view(conn)
+    mark_module_activity_refreshed()
+    logger.info("module_activity_daily refreshed")
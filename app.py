@@ -3,9 +3,13 @@ import logging
 import datetime
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 from sqlalchemy.orm import DeclarativeBase
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_session import Session
+from api.cache import redis_client
+from api.json_provider import OrjsonProvider
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Set up logging
@@ -21,7 +25,16 @@ db = SQLAlchemy(model_class=Base)
 
 # Create Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET")
+
+# Keep session data server-side in Redis; only the signed session id travels in the cookie
+app.config.update(
+    SESSION_TYPE='redis',
+    SESSION_REDIS=redis_client,
+    SESSION_USE_SIGNER=True,
+    SESSION_PERMANENT=False
+)
 # ProxyFix temporarily disabled to fix redirect loops
 # app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
@@ -77,6 +90,11 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         "connect_timeout": 10  # Shorter timeout to fail fast
     }
 }
+# Optional read replica for admin analytics; those pages tolerate replication lag
+replica_database_url = os.environ.get('REPLICA_DATABASE_URL')
+if replica_database_url:
+    app.config['SQLALCHEMY_BINDS'] = {'analytics': replica_database_url}
+    logger.info("Admin analytics queries will use the read replica")
 app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', os.environ.get('SESSION_SECRET'))
 
 # Load remaining config
@@ -86,6 +104,7 @@ app.config.from_object('config.Config')
 db.init_app(app)
 jwt = JWTManager(app)
 CORS(app)
+Session(app)
 
 # Define routes that don't require database
 @app.route('/api')
@@ -105,6 +124,18 @@ def api_healthcheck():
 
 # Auth blueprint will be registered in main.py to avoid circular imports
 
+# Indexes backing the admin user listings and analytics queries
+PERFORMANCE_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_created_at ON users (created_at DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_role ON users (role)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_last_login_at ON users (last_login_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_admin_roles ON users (role) WHERE role IN ('admin', 'super_admin')",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_mood_logs_created_at ON mood_logs (created_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_water_readings_created_at ON water_readings (created_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_plant_logs_created_at ON plant_logs (created_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_budget_logs_created_at ON budget_logs (created_at)",
+]
+
 # Set fallback mode flag initially to False
 app.config['DB_FALLBACK_MODE'] = False
 
@@ -159,6 +190,23 @@ else:
             # Create tables
             db.create_all()
             
+            # Create indexes that create_all() won't add to existing tables.
+            # CONCURRENTLY can't run inside a transaction, hence AUTOCOMMIT.
+            with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for statement in PERFORMANCE_INDEXES:
+                    try:
+                        conn.execute(text(statement))
+                    except Exception as e:
+                        logger.warning(f"Could not create performance index: {e}")
+            
+            # Pre-aggregated module activity for the admin analytics pages
+            try:
+                from api.admin_system import create_module_activity_view
+                with db.engine.begin() as conn:
+                    create_module_activity_view(conn)
+            except Exception as e:
+                logger.warning(f"Could not create module_activity_daily view: {e}")
+            
             # Database connection was successful, keep fallback mode disabled
             app.config['DB_FALLBACK_MODE'] = False
             